@@ -1,10 +1,45 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, render_template, request, redirect, url_for, flash, g, session, jsonify
+from flask import Response, abort, send_file, stream_with_context, has_app_context, before_render_template, template_rendered
 from flask_sqlalchemy import SQLAlchemy
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
 from datetime import datetime, timedelta
-import random
+import atexit
+import csv
+import io
+import json
+import hashlib
+import heapq
 import math
+import mimetypes
 import os
-from collections import defaultdict
+import random
+from bisect import bisect_left
+from collections import defaultdict, deque, namedtuple, OrderedDict
+from functools import lru_cache
+from itertools import groupby
+from sqlalchemy import and_, case, event, func, inspect, union_all
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import defer, joinedload, make_transient_to_detached
+from werkzeug.security import safe_join
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+import time
+import pickle
+import sqlite3
+import threading
+import click
+import numpy as np
+import assets
+import backup_db
+
+try:
+    import fcntl
+except ImportError:  # Windows : verrou limité aux threads d'un même processus
+    fcntl = None
 
 app = Flask(__name__)
 
@@ -17,23 +52,512 @@ if os.environ.get('FLASK_ENV') == 'production':
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url or 'sqlite:///fifa25.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 else:
-app.config['SECRET_KEY'] = 'votre_clé_secrète'
+    app.config['SECRET_KEY'] = 'votre_clé_secrète'
     app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///instance/fifa25.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
+# Cache des classements : 'memory' (par worker) ou 'sqlite' (partagé entre workers).
+# La version des données est toujours partagée, dans le fichier STANDINGS_CACHE_PATH
+app.config['STANDINGS_CACHE_BACKEND'] = os.environ.get('STANDINGS_CACHE_BACKEND', 'memory')
+app.config['STANDINGS_CACHE_PATH'] = os.environ.get('STANDINGS_CACHE_PATH',
+                                                    os.path.join(app.instance_path, 'cache.db'))
+app.config['STANDINGS_CACHE_SIZE'] = int(os.environ.get('STANDINGS_CACHE_SIZE', 256))
+
+# Cache des fragments HTML des gabarits ({% cache %}), même backend que les classements
+app.config['FRAGMENT_CACHE_PATH'] = os.environ.get('FRAGMENT_CACHE_PATH',
+                                                   os.path.join(app.instance_path, 'fragments.db'))
+app.config['FRAGMENT_CACHE_SIZE'] = int(os.environ.get('FRAGMENT_CACHE_SIZE', 128))
+
+# Mises à jour en direct (/events) : scrutation du journal des changements par worker (s),
+# commentaire de maintien de connexion (s), durée d'un flux avant reconnexion du client (s),
+# changements gardés en mémoire par worker et lignes conservées dans le journal
+app.config['LIVE_POLL_INTERVAL'] = float(os.environ.get('LIVE_POLL_INTERVAL', 1.0))
+app.config['LIVE_HEARTBEAT'] = float(os.environ.get('LIVE_HEARTBEAT', 15))
+app.config['LIVE_STREAM_DURATION'] = float(os.environ.get('LIVE_STREAM_DURATION', 300))
+app.config['LIVE_BACKLOG'] = int(os.environ.get('LIVE_BACKLOG', 256))
+app.config['CHANGE_LOG_SIZE'] = int(os.environ.get('CHANGE_LOG_SIZE', 1000))
+
+# Championnat toutes rondes : 1 = simple, 2 = aller-retour ; journées jouées chaque semaine
+# (0 = tout le championnat chaque semaine ; les grandes ligues en jouent moins, 1 = un match par joueur)
+app.config['ROUND_ROBIN_LEGS'] = int(os.environ.get('ROUND_ROBIN_LEGS', 1))
+app.config['ROUNDS_PER_WEEK'] = int(os.environ.get('ROUNDS_PER_WEEK', 0))
+
+# Nombre de joueurs promus/relégués entre deux divisions voisines en fin de saison
+app.config['PROMOTION_SPOTS'] = int(os.environ.get('PROMOTION_SPOTS', 1))
+
+# SQLite : attente maximale d'un verrou (ms) et nombre de rejeux d'une écriture verrouillée
+app.config['SQLITE_BUSY_TIMEOUT'] = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+app.config['DB_WRITE_RETRIES'] = int(os.environ.get('DB_WRITE_RETRIES', 3))
+app.config['DB_WRITE_LOCK_PATH'] = os.environ.get('DB_WRITE_LOCK_PATH',
+                                                  os.path.join(app.instance_path, 'db-write.lock'))
+
+# Pool de connexions propre à chaque worker gunicorn
+_pool_options = {
+    'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+    'pool_timeout': 30,
+}
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+    _pool_options['connect_args'] = {'timeout': app.config['SQLITE_BUSY_TIMEOUT'] / 1000}
+else:
+    _pool_options.update(pool_recycle=1800, pool_pre_ping=True)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = _pool_options
+
+# Instantanés incrémentaux planifiés, en secondes (0 pour les désactiver) : un seul worker
+# les prend et fait alors aussi les points de contrôle du WAL
+app.config['BACKUP_INTERVAL'] = int(os.environ.get('BACKUP_INTERVAL', 0))
+app.config['BACKUP_STORE_PATH'] = os.environ.get('BACKUP_STORE_PATH',
+                                                 os.path.join(app.root_path, 'backups', 'store'))
+
+# Départage des égalités de points : 'goal_average' (moyenne puis différence de buts)
+# ou 'head_to_head' (confrontations directes d'abord)
+app.config['STANDINGS_TIEBREAK'] = os.environ.get('STANDINGS_TIEBREAK', 'goal_average')
+
+# Classement Elo : note de départ et facteur K (après un changement, lancer flask replay-ratings)
+app.config['ELO_INITIAL'] = float(os.environ.get('ELO_INITIAL', 1500))
+app.config['ELO_K'] = float(os.environ.get('ELO_K', 32))
+
+# Simulation Monte Carlo de la fin de saison, en arrière-plan : nombre de saisons simulées,
+# taille des lots, plafond de cases (matchs x tirages) par lot qui borne la mémoire,
+# processus dédiés (0 = calcul dans un thread du worker web) et délai (s) avant de lancer
+# la simulation, pour regrouper les scores saisis à la suite
+app.config['SIMULATION_RUNS'] = int(os.environ.get('SIMULATION_RUNS', 100000))
+app.config['SIMULATION_CHUNK_SIZE'] = int(os.environ.get('SIMULATION_CHUNK_SIZE', 25000))
+app.config['SIMULATION_MAX_CELLS'] = int(os.environ.get('SIMULATION_MAX_CELLS', 2000000))
+app.config['SIMULATION_WORKERS'] = int(os.environ.get('SIMULATION_WORKERS', 0))
+app.config['SIMULATION_DELAY'] = float(os.environ.get('SIMULATION_DELAY', 2.0))
+
+# Nombre de saisons par page de l'historique
+app.config['SEASON_HISTORY_PAGE_SIZE'] = int(os.environ.get('SEASON_HISTORY_PAGE_SIZE', 20))
+
+# Exports en flux : nombre de lignes lues par lot côté serveur
+app.config['EXPORT_CHUNK_SIZE'] = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+
+# Instrumentation : latence par route pour chaque requête ; requêtes SQL, rendus de gabarits
+# et fonctions critiques pour une fraction des requêtes (METRICS_SAMPLE_RATE, 0 = aucune)
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', '1') == '1'
+app.config['METRICS_SAMPLE_RATE'] = float(os.environ.get('METRICS_SAMPLE_RATE', 1.0))
+# Totaux partagés par tous les workers : fichier SQLite et intervalle (s) auquel chaque
+# worker y reporte ses mesures
+app.config['METRICS_PATH'] = os.environ.get('METRICS_PATH', os.path.join(app.instance_path, 'metrics.db'))
+app.config['METRICS_FLUSH_INTERVAL'] = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+# Requêtes plus lentes que ce seuil journalisées avec leur SQL le plus coûteux (0 = jamais)
+app.config['SLOW_REQUEST_MS'] = float(os.environ.get('SLOW_REQUEST_MS', 500))
+
 db = SQLAlchemy(app)
 
+@event.listens_for(Engine, 'connect')
+def _configure_sqlite_connection(dbapi_connection, connection_record):
+    """WAL et busy_timeout sur chaque connexion SQLite : les lecteurs n'attendent jamais l'écrivain"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute(f"PRAGMA busy_timeout={app.config['SQLITE_BUSY_TIMEOUT']}")
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    if app.config['BACKUP_INTERVAL'] > 0:
+        # Le planificateur d'instantanés fait seul les points de contrôle : les pages du WAL
+        # lui désignent alors les blocs modifiés depuis l'instantané précédent
+        cursor.execute('PRAGMA wal_autocheckpoint=0')
+    cursor.close()
+
+_write_thread_lock = threading.Lock()
+_write_lock_state = threading.local()
+
+def _holds_write_lock():
+    return getattr(_write_lock_state, 'held', False)
+
+@contextmanager
+def write_lock():
+    """Un seul écrivain à la fois : verrou de thread, plus un verrou de fichier entre workers
+    
+    Réentrant pour un même thread, une vue d'écriture pouvant en appeler une autre.
+    """
+    if _holds_write_lock():
+        yield
+        return
+    with _write_thread_lock:
+        _write_lock_state.held = True
+        try:
+            if fcntl is None or db.engine.url.get_backend_name() != 'sqlite':
+                yield
+                return
+            os.makedirs(os.path.dirname(app.config['DB_WRITE_LOCK_PATH']) or '.', exist_ok=True)
+            with open(app.config['DB_WRITE_LOCK_PATH'], 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _write_lock_state.held = False
+
+@event.listens_for(Engine, 'commit')
+def _note_commit(connection):
+    # Une vue qui a déjà commité ne peut plus être rejouée sans refaire ses écritures
+    _write_lock_state.committed = True
+
+def _is_locked_error(error):
+    message = str(error.orig).lower()
+    return 'locked' in message or 'busy' in message
+
+def serialized_write(view):
+    """Fait passer une vue d'écriture par le verrou d'écriture et la rejoue si la base reste verrouillée
+    
+    Les vues GET/POST ne verrouillent que leurs POST ; les lectures ne passent jamais par ici.
+    Seule une tentative sans aucun commit est rejouée, c'est-à-dire une transaction annulée
+    en entier : après un premier commit (score enregistré puis journal des changements en
+    échec, par exemple), rejouer referait l'écriture et l'erreur est levée telle quelle.
+    Les messages flash de la tentative abandonnée sont retirés avant de rejouer.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if _holds_write_lock() or (request.method == 'GET' and 'POST' in request.url_rule.methods):
+            return view(*args, **kwargs)
+        
+        retries = app.config['DB_WRITE_RETRIES']
+        flashes = list(session.get('_flashes', []))
+        for attempt in range(retries + 1):
+            try:
+                with write_lock():
+                    _write_lock_state.committed = False
+                    return view(*args, **kwargs)
+            except OperationalError as error:
+                db.session.rollback()
+                if not _is_locked_error(error) or attempt == retries or _write_lock_state.committed:
+                    raise
+                if flashes:
+                    session['_flashes'] = list(flashes)
+                else:
+                    session.pop('_flashes', None)
+                time.sleep(0.05 * 2 ** attempt)
+    return wrapper
+
+class SQLiteFile:
+    """Fichier SQLite local ouvert une fois par thread, en WAL, hors de la base de l'application"""
+    
+    SCHEMA = ''
+    
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connect().executescript(self.SCHEMA)
+    
+    def _connect(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self.local.connection = connection
+        return connection
+
+# Bornes des histogrammes de durée, en secondes
+METRIC_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Requêtes SQL les plus lentes gardées par requête échantillonnée, pour le journal
+SLOW_SQL_KEPT = 5
+
+def _format_labels(labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{key}="{escape(value)}"' for key, value in labels) + '}'
+
+class SharedMetrics(SQLiteFile):
+    """Totaux des métriques de tous les workers gunicorn de la machine
+    
+    Une ligne par série et par case : la somme (slot -1) ou une case d'histogramme (slot 0..n),
+    ou la valeur d'un compteur (slot 0). Les totaux survivent aux redémarrages des workers,
+    comme le veulent des compteurs Prometheus.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS metric_value (
+            name TEXT NOT NULL, labels TEXT NOT NULL, slot INTEGER NOT NULL, value REAL NOT NULL,
+            PRIMARY KEY (name, labels, slot));
+    """
+    
+    def add(self, deltas):
+        connection = self._connect()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany('INSERT INTO metric_value (name, labels, slot, value) VALUES (?, ?, ?, ?) '
+                                   'ON CONFLICT(name, labels, slot) DO UPDATE SET value = value + excluded.value',
+                                   [(*key, value) for key, value in deltas.items()])
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+    
+    def totals(self):
+        return self._connect().execute('SELECT name, labels, slot, value FROM metric_value').fetchall()
+
+def _format_value(value):
+    return int(value) if float(value).is_integer() else value
+
+class MetricsRegistry:
+    """Compteurs et histogrammes de tous les workers, exposés au format texte de Prometheus
+    
+    Chaque worker cumule ses mesures en mémoire et les ajoute aux totaux partagés
+    (SharedMetrics) toutes les flush_interval secondes, depuis un thread démarré à la
+    première mesure (après le fork de gunicorn). /metrics renvoie donc les mêmes totaux
+    quel que soit le worker qui répond.
+    """
+    
+    def __init__(self, store, flush_interval, buckets=METRIC_BUCKETS):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.kinds = OrderedDict()
+        # (nom, étiquettes en JSON, case) -> valeur à ajouter aux totaux partagés
+        self.pending = defaultdict(float)
+        self.thread = None
+    
+    def describe(self, name, kind, text):
+        self.kinds[name] = (kind, text)
+    
+    def inc(self, name, labels, value=1):
+        key = json.dumps(labels)
+        with self.lock:
+            self.pending[(name, key, 0)] += value
+            self._start()
+    
+    def observe(self, name, labels, value):
+        index = bisect_left(self.buckets, value)
+        key = json.dumps(labels)
+        with self.lock:
+            self.pending[(name, key, index)] += 1
+            self.pending[(name, key, -1)] += value
+            self._start()
+    
+    def _start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self.thread.start()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as error:
+                app.logger.warning('Report des métriques impossible : %s', error)
+    
+    def flush(self):
+        """Ajoute les mesures du worker aux totaux partagés ; rendues au tampon en cas d'échec"""
+        with self.lock:
+            deltas, self.pending = self.pending, defaultdict(float)
+        if not deltas:
+            return
+        try:
+            self.store.add(deltas)
+        except BaseException:
+            with self.lock:
+                for key, value in deltas.items():
+                    self.pending[key] += value
+            raise
+    
+    def render(self):
+        self.flush()
+        series = defaultdict(dict)
+        for name, key, slot, value in self.store.totals():
+            series[name].setdefault(key, {})[slot] = value
+        
+        lines = []
+        for name, (kind, text) in self.kinds.items():
+            lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}']
+            for key, slots in sorted(series[name].items()):
+                labels = tuple(tuple(pair) for pair in json.loads(key))
+                if kind == 'counter':
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(slots[0])}')
+                    continue
+                cumulative = 0
+                for index, bound in enumerate(self.buckets + ('+Inf',)):
+                    cumulative += int(slots.get(index, 0))
+                    lines.append(f'{name}_bucket{_format_labels(labels + (("le", bound),))} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {slots.get(-1, 0.0):.6f}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+metrics_registry = MetricsRegistry(SharedMetrics(app.config['METRICS_PATH']),
+                                   app.config['METRICS_FLUSH_INTERVAL'])
+# Mesures des dernières secondes reportées à l'arrêt normal du worker
+atexit.register(metrics_registry.flush)
+metrics_registry.describe('fc26_request_duration_seconds', 'histogram', 'Durée des requêtes HTTP par route')
+metrics_registry.describe('fc26_requests_total', 'counter', 'Requêtes HTTP par route et code de réponse')
+metrics_registry.describe('fc26_sampled_requests_total', 'counter', 'Requêtes échantillonnées (mesures détaillées)')
+metrics_registry.describe('fc26_sql_queries_total', 'counter', 'Requêtes SQL des requêtes échantillonnées')
+metrics_registry.describe('fc26_sql_seconds_total', 'counter', 'Temps SQL des requêtes échantillonnées')
+metrics_registry.describe('fc26_template_render_seconds', 'histogram', 'Durée de rendu des gabarits')
+metrics_registry.describe('fc26_function_seconds', 'histogram', 'Durée des fonctions critiques')
+
+class RequestMetrics:
+    """Mesures détaillées d'une requête échantillonnée"""
+    
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.slowest = []  # tas (durée, SQL) des requêtes les plus lentes
+        self.renders = []  # débuts des rendus de gabarits en cours
+
+def _request_metrics():
+    return g.get('request_metrics') if has_app_context() else None
+
+def timed(function):
+    """Mesure la durée d'une fonction critique pendant les requêtes échantillonnées"""
+    labels = (('function', function.__name__),)
+    
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if _request_metrics() is None:
+            return function(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics_registry.observe('fc26_function_seconds', labels, time.perf_counter() - started)
+    return wrapper
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if _request_metrics() is not None:
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    metrics = _request_metrics()
+    if metrics is None or not conn.info.get('query_started'):
+        return
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    metrics.queries += 1
+    metrics.sql_seconds += elapsed
+    heapq.heappush(metrics.slowest, (elapsed, statement))
+    if len(metrics.slowest) > SLOW_SQL_KEPT:
+        heapq.heappop(metrics.slowest)
+
+@before_render_template.connect_via(app)
+def _start_render_timer(sender, template, context, **extra):
+    metrics = _request_metrics()
+    if metrics is not None:
+        metrics.renders.append(time.perf_counter())
+
+@template_rendered.connect_via(app)
+def _stop_render_timer(sender, template, context, **extra):
+    metrics = _request_metrics()
+    if metrics is not None and metrics.renders:
+        metrics_registry.observe('fc26_template_render_seconds', (('template', template.name),),
+                                 time.perf_counter() - metrics.renders.pop())
+
+@app.before_request
+def _start_request_metrics():
+    if not app.config['METRICS_ENABLED']:
+        return
+    g.request_started = time.perf_counter()
+    if random.random() < app.config['METRICS_SAMPLE_RATE']:
+        g.request_metrics = RequestMetrics()
+
+@app.after_request
+def _record_request_metrics(response):
+    started = g.pop('request_started', None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    labels = (('endpoint', request.endpoint or 'none'), ('method', request.method))
+    metrics_registry.observe('fc26_request_duration_seconds', labels, elapsed)
+    metrics_registry.inc('fc26_requests_total', labels + (('status', response.status_code),))
+    
+    metrics = g.pop('request_metrics', None)
+    if metrics is not None:
+        metrics_registry.inc('fc26_sampled_requests_total', labels)
+        metrics_registry.inc('fc26_sql_queries_total', labels, metrics.queries)
+        metrics_registry.inc('fc26_sql_seconds_total', labels, metrics.sql_seconds)
+    
+    slow_ms = app.config['SLOW_REQUEST_MS']
+    if slow_ms > 0 and elapsed * 1000 >= slow_ms:
+        details = ''
+        if metrics is not None:
+            details = f', {metrics.queries} requête(s) SQL en {metrics.sql_seconds * 1000:.0f} ms'
+            details += ''.join(f'\n  {duration * 1000:.1f} ms : {" ".join(statement.split())[:500]}'
+                               for duration, statement in sorted(metrics.slowest, reverse=True))
+        app.logger.warning('🐢 Requête lente : %s %s en %.0f ms%s',
+                           request.method, request.full_path.rstrip('?'), elapsed * 1000, details)
+    return response
+
+def _active_season_data():
+    season = db.session.scalars(db.select(Season).filter_by(is_active=True).limit(1)).first()
+    if season is None:
+        return None
+    return {column.key: getattr(season, column.key) for column in Season.__table__.columns}
+
+def _load_active_season(fresh=False):
+    if not fresh:
+        # Colonnes de la saison dans le cache des classements, sous la version des données :
+        # toute écriture la périme, et les pages en cache ne coûtent alors aucune requête SQL
+        data = standings_cache.get_or_compute(_active_season_data, 'active_season')
+        if data is None:
+            return None
+        season = Season(**data)
+        make_transient_to_detached(season)
+        return db.session.merge(season, load=False)
+    
+    # populate_existing : une copie du cache déjà rattachée à la session est relue
+    return db.session.scalars(
+        db.select(Season).filter_by(is_active=True).limit(1).execution_options(populate_existing=True)
+    ).first()
+
+def get_active_season(fresh=False):
+    """Retourne la saison active, chargée au plus une fois par requête
+    
+    fresh=True la relit en base, jamais depuis le cache : à utiliser sous le
+    verrou d'écriture par tout ce qui modifie la saison ou s'appuie sur sa semaine courante.
+    """
+    if fresh or 'active_season' not in g:
+        g.active_season = _load_active_season(fresh)
+    return g.active_season
+
+def invalidate_active_season():
+    """Oublie la saison active de la requête après une modification de la saison
+    
+    La copie en cache est périmée par standings_cache.invalidate(), appelé après la
+    même écriture.
+    """
+    g.pop('active_season', None)
+
 @app.context_processor
 def inject_season():
     """Injecte la saison actuelle dans tous les templates"""
-    season = Season.query.filter_by(is_active=True).first()
-    return dict(current_season=season)
+    return dict(current_season=get_active_season())
+
+class Division(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+    level = db.Column(db.Integer, unique=True, nullable=False)  # 1 = division la plus haute
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Player(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_date = db.Column(db.DateTime, default=datetime.utcnow)
+    division_id = db.Column(db.Integer, db.ForeignKey('division.id'))
+    rating = db.Column(db.Float, nullable=False, default=lambda: app.config['ELO_INITIAL'])  # Elo
+    
+    __table_args__ = (
+        db.Index('ix_player_division_active', 'division_id', 'is_active'),
+    )
+    
+    division = db.relationship('Division')
+    
+    @property
+    def username(self):
+        # Nom attendu par les gabarits du tournoi
+        return self.name
+    
+    @property
+    def card_rating(self):
+        # Note de carte façon FC (40-99) : 75 pour la note Elo de départ
+        return max(40, min(99, round(75 + (self.rating - app.config['ELO_INITIAL']) / 10)))
 
 class Season(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -42,6 +566,49 @@ class Season(db.Model):
     current_week = db.Column(db.Integer, default=1)
     is_active = db.Column(db.Boolean, default=True)
     status = db.Column(db.String(20), default='in_progress')  # in_progress, finished
+    
+    __table_args__ = (
+        # Pagination par curseur de l'historique, des plus récentes aux plus anciennes
+        db.Index('ix_season_start_date_id', 'start_date', 'id'),
+    )
+
+class Tournament(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False)
+    status = db.Column(db.String(20), default='in_progress')  # in_progress, finished
+    format = db.Column(db.String(20), default='elimination')  # elimination, knockout
+    current_round = db.Column(db.Integer, default=1)
+    champion_id = db.Column(db.Integer, db.ForeignKey('player.id'))
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    season = db.relationship('Season')
+    champion = db.relationship('Player')
+
+class TournamentPlayer(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    is_eliminated = db.Column(db.Boolean, default=False)
+    elimination_round = db.Column(db.Integer)
+    
+    __table_args__ = (
+        db.Index('uq_tournament_player', 'tournament_id', 'player_id', unique=True),
+    )
+    
+    tournament = db.relationship('Tournament')
+    user = db.relationship('Player')
+
+class SeasonPlayer(db.Model):
+    """Effectif d'une saison, figé à son début : le calendrier du championnat en découle"""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    division_id = db.Column(db.Integer, db.ForeignKey('division.id'))
+    
+    __table_args__ = (
+        db.Index('uq_season_player', 'season_id', 'player_id', unique=True),
+    )
 
 class Match(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -49,15 +616,51 @@ class Match(db.Model):
     week_number = db.Column(db.Integer, nullable=False)
     match_number = db.Column(db.Integer, nullable=False)
     date = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_date = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     player1_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
     player2_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
     player1_score = db.Column(db.Integer)
     player2_score = db.Column(db.Integer)
     is_completed = db.Column(db.Boolean, default=False)
+    division_id = db.Column(db.Integer, db.ForeignKey('division.id'))  # division au moment du match
+    # Matchs de tournoi : hors championnat, week_number reprend le numéro de journée
+    tournament_id = db.Column(db.Integer, db.ForeignKey('tournament.id'))
+    round_number = db.Column(db.Integer)
+    winner_id = db.Column(db.Integer, db.ForeignKey('player.id'))
+    # Élimination directe : tableau en tas, 1 = finale, 2-3 = demies, 4-7 = quarts...
+    bracket_slot = db.Column(db.Integer)
+    # Elo : ordre dans lequel le match a été noté, notes des joueurs avant le match, gain du joueur 1
+    rating_seq = db.Column(db.Integer)
+    player1_elo = db.Column(db.Float)
+    player2_elo = db.Column(db.Float)
+    elo_delta = db.Column(db.Float)
+    
+    __table_args__ = (
+        # Sert aussi les filtres (season_id, week_number) et le tri par numéro de match,
+        # pour les requêtes de championnat qui filtrent tournament_id IS NULL
+        db.Index('uq_match_league_number', 'season_id', 'week_number', 'match_number', unique=True,
+                 sqlite_where=db.text('tournament_id IS NULL'),
+                 postgresql_where=db.text('tournament_id IS NULL')),
+        db.Index('uq_match_tournament_round_number', 'tournament_id', 'round_number', 'match_number',
+                 unique=True),
+        db.Index('uq_match_tournament_bracket_slot', 'tournament_id', 'bracket_slot', unique=True),
+        # Index couvrants pour les agrégats de classement par joueur
+        db.Index('ix_match_player1_results', 'season_id', 'player1_id', 'is_completed',
+                 'player1_score', 'player2_score'),
+        db.Index('ix_match_player2_results', 'season_id', 'player2_id', 'is_completed',
+                 'player1_score', 'player2_score'),
+        db.Index('ix_match_season_division_week', 'season_id', 'division_id', 'week_number'),
+        db.Index('ix_match_updated_date', 'updated_date'),
+        # Historique Elo d'un joueur par parcours d'index, de chaque côté
+        db.Index('ix_match_player1_rating', 'player1_id', 'rating_seq'),
+        db.Index('ix_match_player2_rating', 'player2_id', 'rating_seq'),
+    )
     
     season = db.relationship('Season')
     player1 = db.relationship('Player', foreign_keys=[player1_id])
     player2 = db.relationship('Player', foreign_keys=[player2_id])
+    winner = db.relationship('Player', foreign_keys=[winner_id])
+    tournament = db.relationship('Tournament')
     
     def get_winner(self):
         if self.player1_score is None or self.player2_score is None:
@@ -82,6 +685,10 @@ class WeeklyStandings(db.Model):
     points = db.Column(db.Integer, default=0)
     goal_average = db.Column(db.Float, default=0.0)
     
+    __table_args__ = (
+        db.Index('uq_weekly_standings_season_week_player', 'season_id', 'week_number', 'player_id', unique=True),
+    )
+    
     season = db.relationship('Season')
     player = db.relationship('Player')
     
@@ -89,41 +696,558 @@ class WeeklyStandings(db.Model):
         self.goal_average = self.goals_for / self.matches_played if self.matches_played > 0 else 0.0
         self.points = self.wins * 3 + self.draws
 
+class SeasonStandings(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False)
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    matches_played = db.Column(db.Integer, default=0)
+    wins = db.Column(db.Integer, default=0)
+    draws = db.Column(db.Integer, default=0)
+    losses = db.Column(db.Integer, default=0)
+    goals_for = db.Column(db.Integer, default=0)
+    goals_against = db.Column(db.Integer, default=0)
+    points = db.Column(db.Integer, default=0)
+    goal_average = db.Column(db.Float, default=0.0)
+    
+    __table_args__ = (
+        db.Index('uq_season_standings_season_player', 'season_id', 'player_id', unique=True),
+    )
+    
+    season = db.relationship('Season')
+    player = db.relationship('Player')
+    
+    calculate_stats = WeeklyStandings.calculate_stats
+
+class SeasonSnapshot(db.Model):
+    """Bilan figé d'une saison terminée, écrit une seule fois à sa clôture"""
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), unique=True, nullable=False)
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
+    weeks_played = db.Column(db.Integer, default=0)
+    matches_played = db.Column(db.Integer, default=0)
+    matches_total = db.Column(db.Integer, default=0)
+    total_goals = db.Column(db.Integer, default=0)
+    champion_name = db.Column(db.String(80))
+    # JSON : classements finaux par division, récompenses et mouvements de fin de saison
+    data = db.Column(db.Text, nullable=False)
+    
+    season = db.relationship('Season')
+    
+    @property
+    def payload(self):
+        return json.loads(self.data)
+
+class ChangeEvent(db.Model):
+    """Journal des changements diffusés en direct, commun à tous les workers"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    # JSON compact, envoyé tel quel aux clients
+    payload = db.Column(db.Text, nullable=False)
+    created_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+class SeasonOddsResult(db.Model):
+    """Dernières probabilités de classement final, simulées en arrière-plan pour tous les workers"""
+    __tablename__ = 'season_odds'
+    id = db.Column(db.Integer, primary_key=True)
+    season_id = db.Column(db.Integer, db.ForeignKey('season.id'), nullable=False)
+    # 0 pour une saison sans division
+    division_id = db.Column(db.Integer, nullable=False, default=0)
+    # Version des données simulées, et dernière version réservée par un worker pour le calcul
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    claimed_version = db.Column(db.BigInteger, nullable=False, default=0)
+    computed_date = db.Column(db.DateTime)
+    # JSON : SeasonOdds ; vide tant que rien n'est calculé ou s'il ne reste aucun match
+    data = db.Column(db.Text)
+    
+    __table_args__ = (db.UniqueConstraint('season_id', 'division_id', name='uq_season_odds_scope'),)
+
+class SchemaVersion(db.Model):
+    version = db.Column(db.Integer, primary_key=True)
+    description = db.Column(db.String(200), nullable=False)
+    applied_date = db.Column(db.DateTime, default=datetime.utcnow)
+
+class MemoryCacheBackend:
+    """Cache LRU en mémoire, propre à chaque worker (les versions, elles, sont partagées)"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+    
+    def get(self, key):
+        with self.lock:
+            if key not in self.entries:
+                return None
+            self.entries.move_to_end(key)
+            return self.entries[key]
+    
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+class SharedVersions(SQLiteFile):
+    """Versions des données communes à tous les workers gunicorn de la machine
+    
+    Une version est l'horodatage (ms) de la dernière écriture, strictement croissant.
+    Elle vit dans un fichier partagé quel que soit le backend des entrées : une écriture
+    traitée par un worker invalide aussi le cache, les fragments et les ETag des autres.
+    """
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_version (
+            name TEXT PRIMARY KEY, version INTEGER NOT NULL);
+    """
+    
+    def get(self, name):
+        connection = self._connect()
+        row = connection.execute('SELECT version FROM cache_version WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            connection.execute('INSERT OR IGNORE INTO cache_version (name, version) VALUES (?, ?)',
+                               (name, int(time.time() * 1000)))
+            row = connection.execute('SELECT version FROM cache_version WHERE name = ?', (name,)).fetchone()
+        return row[0]
+    
+    def bump(self, name):
+        connection = self._connect()
+        connection.execute('INSERT INTO cache_version (name, version) VALUES (?, ?) '
+                           'ON CONFLICT(name) DO UPDATE SET version = max(version + 1, excluded.version)',
+                           (name, int(time.time() * 1000)))
+        return self.get(name)
+
+class SQLiteCacheBackend(SQLiteFile):
+    """Cache LRU stocké dans un fichier SQLite, partagé par tous les workers gunicorn"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entry (
+            key TEXT PRIMARY KEY, value BLOB NOT NULL, last_used REAL NOT NULL);
+        CREATE INDEX IF NOT EXISTS ix_cache_entry_last_used ON cache_entry (last_used);
+    """
+    
+    def __init__(self, path, max_entries):
+        super().__init__(path)
+        self.max_entries = max_entries
+    
+    def get(self, key):
+        connection = self._connect()
+        row = connection.execute('SELECT value FROM cache_entry WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        connection.execute('UPDATE cache_entry SET last_used = ? WHERE key = ?', (time.time(), key))
+        return pickle.loads(row[0])
+    
+    def set(self, key, value):
+        connection = self._connect()
+        connection.execute('INSERT OR REPLACE INTO cache_entry (key, value, last_used) VALUES (?, ?, ?)',
+                           (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), time.time()))
+        connection.execute('DELETE FROM cache_entry WHERE key IN ('
+                           'SELECT key FROM cache_entry ORDER BY last_used DESC LIMIT -1 OFFSET ?)',
+                           (self.max_entries,))
+    
+    def clear(self):
+        self._connect().execute('DELETE FROM cache_entry')
+
+class StandingsCache:
+    """Cache des classements et matchs indexé par (saison, semaine, version des données)
+    
+    La version des données de la ligue (SharedVersions) est commune à tous les workers :
+    elle sert aussi d'ETag et de Last-Modified aux pages, avec celle des probabilités de fin
+    de saison, qui changent en arrière-plan sans nouvelle écriture.
+    """
+    
+    VERSION_NAME = 'standings'
+    ODDS_VERSION_NAME = 'odds'
+    
+    def __init__(self, backend, versions):
+        self.backend = backend
+        self.versions = versions
+    
+    def version(self, name=VERSION_NAME):
+        # Une seule lecture de chaque version par requête
+        versions = g.setdefault('cache_versions', {})
+        if name not in versions:
+            versions[name] = self.versions.get(name)
+        return versions[name]
+    
+    def get_or_compute(self, compute, kind, *parts):
+        key = ':'.join(str(part) for part in (kind, *parts, self.version()))
+        value = self.backend.get(key)
+        if value is None:
+            value = compute()
+            self.backend.set(key, value)
+        return value
+    
+    def invalidate(self, name=VERSION_NAME):
+        """À appeler après le commit d'une écriture qui modifie les classements"""
+        g.get('cache_versions', {}).pop(name, None)
+        return self.versions.bump(name)
+
+def create_cache_backend(path, max_entries):
+    if app.config['STANDINGS_CACHE_BACKEND'] == 'sqlite':
+        return SQLiteCacheBackend(path, max_entries)
+    return MemoryCacheBackend(max_entries)
+
+standings_cache = StandingsCache(create_cache_backend(app.config['STANDINGS_CACHE_PATH'],
+                                                     app.config['STANDINGS_CACHE_SIZE']),
+                                SharedVersions(app.config['STANDINGS_CACHE_PATH']))
+
+# Ressources statiques : sources dans assets/, copies à empreinte précompressées dans static/dist/
+ASSET_SOURCE_DIR = os.path.join(app.root_path, assets.SOURCE_DIR)
+ASSET_OUTPUT_DIR = os.path.join(app.static_folder, 'dist')
+# Les noms changent avec le contenu : les navigateurs peuvent les garder un an sans revalider
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+asset_manifest = assets.build_assets(ASSET_SOURCE_DIR, ASSET_OUTPUT_DIR)
+
+@app.template_global()
+def asset_url(name):
+    """URL à empreinte d'une ressource de assets/ (ex. asset_url('css/site.css'))"""
+    return url_for('asset', filename=asset_manifest[name])
+
+def _build_token():
+    """Empreinte du code, des gabarits et des ressources déployés : un déploiement change tous les ETags"""
+    paths = [os.path.abspath(__file__)]
+    for directory in (os.path.join(app.root_path, app.template_folder), ASSET_SOURCE_DIR):
+        for root, _, names in os.walk(directory):
+            paths.extend(os.path.join(root, name) for name in sorted(names))
+    digest = hashlib.sha1()
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode())
+    return digest.hexdigest()[:12]
+
+BUILD_TOKEN = _build_token()
+
+class FragmentCache:
+    """HTML rendu de blocs de gabarits, indexé par (nom, paramètres, version des données)
+    
+    LRU borné séparé de celui des classements : les fragments sont plus gros et ne doivent
+    pas en évincer les données. Le code déployé et le départage font partie de la clé.
+    """
+    
+    def __init__(self, backend):
+        self.backend = backend
+    
+    def get_or_render(self, render, *parts):
+        key = ':'.join(str(part) for part in ('fragment', BUILD_TOKEN, app.config['STANDINGS_TIEBREAK'],
+                                               *parts, standings_cache.version()))
+        html = self.backend.get(key)
+        if html is None:
+            html = str(render())
+            self.backend.set(key, html)
+        return Markup(html)
+
+fragment_cache = FragmentCache(create_cache_backend(app.config['FRAGMENT_CACHE_PATH'],
+                                                    app.config['FRAGMENT_CACHE_SIZE']))
+
+class FragmentCacheExtension(Extension):
+    """{% cache 'nom', paramètre, ... %}...{% endcache %} : bloc rendu une fois par version des données
+    
+    Les paramètres doivent couvrir tout ce dont le bloc dépend en dehors des données de la
+    ligue (saison, semaine, division...). Deux gabarits qui emploient le même nom et les
+    mêmes paramètres partagent le fragment.
+    """
+    tags = {'cache'}
+    
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(['name:endcache'], drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render_cached', parts), [], [], body).set_lineno(lineno)
+    
+    def _render_cached(self, *parts, caller):
+        return fragment_cache.get_or_render(caller, *parts)
+
+app.jinja_env.add_extension(FragmentCacheExtension)
+
+Change = namedtuple('Change', 'id kind payload')
+
+def load_changes(after_id):
+    """Changements postérieurs à after_id lus dans le journal ; None s'ils ont déjà été purgés"""
+    oldest = db.session.scalar(db.select(func.min(ChangeEvent.id)))
+    if oldest is not None and after_id < oldest - 1:
+        return None
+    rows = db.session.execute(
+        db.select(ChangeEvent.id, ChangeEvent.kind, ChangeEvent.payload)
+        .where(ChangeEvent.id > after_id).order_by(ChangeEvent.id)
+    )
+    return [Change(*row) for row in rows]
+
+class ChangeBroker:
+    """Diffuse le journal des changements aux flux SSE d'un worker
+    
+    Un seul thread par worker interroge la table change_event ; les flux ouverts attendent
+    sur une condition, sans requête ni connexion à la base. Les derniers changements restent
+    en mémoire pour les clients qui se reconnectent avec Last-Event-ID.
+    """
+    
+    def __init__(self, poll_interval, backlog):
+        self.poll_interval = poll_interval
+        self.changes = deque(maxlen=backlog)
+        self.condition = threading.Condition()
+        self.thread = None
+        self.last_id = 0
+        # Dernier identifiant absent de la mémoire : au-delà, tous les changements y sont
+        self.floor = 0
+    
+    def start(self):
+        """Démarre la scrutation au premier usage (après le fork des workers gunicorn)"""
+        with self.condition:
+            if self.thread is not None:
+                return
+            self.last_id = self.floor = db.session.scalar(db.select(func.max(ChangeEvent.id))) or 0
+            self.thread = threading.Thread(target=self._poll, name='change-broker', daemon=True)
+            self.thread.start()
+    
+    def latest_id(self):
+        self.start()
+        return self.last_id
+    
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            try:
+                with app.app_context():
+                    rows = db.session.execute(
+                        db.select(ChangeEvent.id, ChangeEvent.kind, ChangeEvent.payload)
+                        .where(ChangeEvent.id > self.last_id).order_by(ChangeEvent.id)
+                    ).all()
+            except Exception:
+                app.logger.exception('📡 Lecture du journal des changements impossible')
+                continue
+            if not rows:
+                continue
+            with self.condition:
+                for row in rows:
+                    if len(self.changes) == self.changes.maxlen:
+                        self.floor = self.changes[0].id
+                    self.changes.append(Change(*row))
+                self.last_id = rows[-1].id
+                self.condition.notify_all()
+    
+    def wait(self, after_id, timeout):
+        """Changements postérieurs à after_id, en attendant jusqu'à timeout secondes
+        
+        Liste vide si rien n'est arrivé, None si after_id est trop ancien pour la mémoire.
+        """
+        with self.condition:
+            if after_id < self.floor:
+                return None
+            self.condition.wait_for(lambda: self.last_id > after_id, timeout)
+            if after_id < self.floor:
+                return None
+            return [change for change in self.changes if change.id > after_id]
+
+change_broker = ChangeBroker(app.config['LIVE_POLL_INTERVAL'], app.config['LIVE_BACKLOG'])
+
+@app.template_global()
+def live_since():
+    """Dernier changement connu au rendu : le client reprend le flux à partir de là"""
+    return change_broker.latest_id()
+
+def conditional_get(view):
+    """ETag et Last-Modified tirés de la version des données ; 304 sans SQL ni rendu
+    
+    La version est lue dans SharedVersions, commune à tous les workers : une écriture
+    traitée par l'un retire l'ETag de la page chez tous les autres, tout comme de nouvelles
+    probabilités de fin de saison. L'ETag couvre aussi le code déployé, l'URL complète et
+    la division du visiteur.
+    Seul If-None-Match est honoré : à la seconde près, If-Modified-Since confondrait deux
+    écritures rapprochées. Un message flash en attente ou un changement de division
+    (?division=) force toujours le rendu.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method != 'GET' or 'division' in request.args or '_flashes' in session:
+            return view(*args, **kwargs)
+        
+        version = standings_cache.version()
+        odds_version = standings_cache.version(StandingsCache.ODDS_VERSION_NAME)
+        # Version partagée, jamais celle d'un worker : pas de 304 sur des données changées ailleurs
+        etag = hashlib.sha1(f'{BUILD_TOKEN}:{version}:{odds_version}:{session.get("division_id")}:'
+                            f'{request.full_path}'.encode()).hexdigest()[:20]
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.last_modified = datetime.utcfromtimestamp(max(version, odds_version) / 1000)
+        response.set_etag(etag, weak=True)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        return response
+    return wrapper
+
+# Copies des joueurs et matchs sans état ORM, sûres à garder en cache
+PlayerSnapshot = namedtuple('PlayerSnapshot', 'id name')
+DivisionSnapshot = namedtuple('DivisionSnapshot', 'id name level')
+
+class MatchSnapshot(namedtuple('MatchSnapshot', 'id week_number match_number player1_id player2_id '
+                                                 'player1 player2 player1_score player2_score is_completed')):
+    __slots__ = ()
+    get_winner = Match.get_winner
+
+def freeze_player(player):
+    return PlayerSnapshot(player.id, player.name)
+
+def freeze_standings(standings):
+    return [dict(standing, player=freeze_player(standing['player'])) for standing in standings]
+
+def freeze_matches(matches):
+    return [MatchSnapshot(m.id, m.week_number, m.match_number, m.player1_id, m.player2_id,
+                          freeze_player(m.player1), freeze_player(m.player2),
+                          m.player1_score, m.player2_score, bool(m.is_completed))
+            for m in matches]
+
+def get_week_matches(season_id, week_number, division_id=None):
+    """Matchs d'une semaine (d'une division), servis depuis le cache"""
+    def compute():
+        query = Match.query.options(
+            joinedload(Match.player1), joinedload(Match.player2)
+        ).filter_by(season_id=season_id, week_number=week_number, tournament_id=None)
+        if division_id is not None:
+            query = query.filter_by(division_id=division_id)
+        return freeze_matches(query.order_by(Match.match_number).all())
+    return standings_cache.get_or_compute(compute, 'matches', season_id, week_number, division_id)
+
+def get_weekly_standings(season_id, week_number, division_id=None):
+    """Classement hebdomadaire (d'une division), servi depuis le cache"""
+    return standings_cache.get_or_compute(
+        lambda: freeze_standings(load_weekly_standings(season_id, week_number, division_id)),
+        'weekly', season_id, week_number, division_id, app.config['STANDINGS_TIEBREAK'])
+
+def get_cumulative_standings(season_id, division_id=None):
+    """Classement cumulé (d'une division), servi depuis le cache"""
+    return standings_cache.get_or_compute(
+        lambda: freeze_standings(load_cumulative_standings(season_id, division_id)),
+        'cumulative', season_id, division_id, app.config['STANDINGS_TIEBREAK'])
+
+LIVE_STANDING_FIELDS = ('matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against',
+                        'points', 'goal_difference', 'goal_average')
+
+def _live_standings(standings):
+    return [dict({field: standing[field] for field in LIVE_STANDING_FIELDS}, name=standing['player'].name)
+            for standing in standings]
+
+def publish_score_changes(matches):
+    """Ajoute au journal les scores saisis et les classements qui en découlent
+    
+    À appeler après le commit des scores et l'invalidation du cache : les classements sont
+    recalculés une seule fois, pour tous les clients, et restent en cache pour les pages.
+    L'événement est écrit après le changement de la version partagée : un client qui le
+    reçoit puis recharge la page, sur n'importe quel worker, voit déjà les nouvelles données.
+    Un événement par (saison, semaine, division) touchée.
+    """
+    groups = defaultdict(list)
+    for match in matches:
+        if match.tournament_id is None:
+            groups[(match.season_id, match.week_number, match.division_id)].append(match)
+    if not groups:
+        return
+    
+    events = []
+    for (season_id, week_number, division_id), group in groups.items():
+        payload = {
+            'season': season_id,
+            'week': week_number,
+            'division': division_id,
+            'matches': [{'id': match.id, 'score1': match.player1_score, 'score2': match.player2_score,
+                         'winner': match.get_winner().name if match.get_winner() else None}
+                        for match in group],
+            'weekly': _live_standings(get_weekly_standings(season_id, week_number, division_id)),
+            'cumulative': _live_standings(get_cumulative_standings(season_id, division_id)),
+        }
+        events.append(ChangeEvent(kind='score', payload=json.dumps(payload, separators=(',', ':'))))
+    db.session.add_all(events)
+    db.session.flush()
+    
+    # Le journal ne garde que les CHANGE_LOG_SIZE derniers changements
+    db.session.execute(db.delete(ChangeEvent).where(ChangeEvent.id <= events[-1].id - app.config['CHANGE_LOG_SIZE']))
+    db.session.commit()
+    
+    # Probabilités de fin de saison recalculées dès maintenant, sans attendre une visite
+    for season_id, division_id in {(season_id, division_id) for season_id, _, division_id in groups}:
+        odds_refresher.request(season_id, division_id, standings_cache.version())
+
+def get_divisions():
+    return Division.query.order_by(Division.level).all()
+
+def get_cached_divisions():
+    """Divisions en copies figées, depuis le cache : aucune requête pour les pages publiques"""
+    return standings_cache.get_or_compute(
+        lambda: [DivisionSnapshot(division.id, division.name, division.level) for division in get_divisions()],
+        'divisions')
+
+def default_division():
+    """Division d'accueil des nouveaux joueurs : la plus basse, créée si besoin"""
+    division = Division.query.order_by(Division.level.desc()).first()
+    if division is None:
+        division = Division(name='Division 1', level=1)
+        db.session.add(division)
+        db.session.flush()
+    return division
+
+def resolve_viewer_division(divisions):
+    """Division affichée au visiteur : ?division=<id>, mémorisée en session, sinon la première"""
+    division_id = request.args.get('division', type=int)
+    if division_id is not None:
+        session['division_id'] = division_id
+    division_id = session.get('division_id')
+    
+    for division in divisions:
+        if division.id == division_id:
+            return division
+    return divisions[0] if divisions else None
+
 @app.route('/')
+@conditional_get
 def home():
     # Récupérer ou créer la saison active
-    season = Season.query.filter_by(is_active=True).first()
+    season = get_active_season()
     if not season:
         season = Season(name=f"Saison FC 26 {datetime.now().year}")
         db.session.add(season)
         db.session.commit()
+        invalidate_active_season()
     
         # Initialiser les 5 joueurs si c'est une nouvelle saison
         initialize_default_players()
+        standings_cache.invalidate()
     
-    # Récupérer tous les joueurs actifs
-    players = Player.query.filter_by(is_active=True).all()
-    
-    # Récupérer les matchs de la semaine actuelle
-    current_week_matches = Match.query.filter_by(
-        season_id=season.id, 
-        week_number=season.current_week
-    ).order_by(Match.match_number).all()
+    # Seule la division du visiteur est chargée
+    divisions = get_cached_divisions()
+    division = resolve_viewer_division(divisions)
+    division_id = division.id if division else None
     
-    # Calculer les statistiques de la semaine actuelle
-    weekly_standings = calculate_weekly_standings(season.id, season.current_week)
+    # Récupérer les joueurs actifs de la division
+    players = Player.query.filter_by(is_active=True, division_id=division_id).all()
     
-    # Calculer les statistiques cumulées
-    cumulative_standings = calculate_cumulative_standings(season.id)
+    # Matchs et classements de la semaine actuelle (depuis le cache)
+    current_week_matches = get_week_matches(season.id, season.current_week, division_id)
+    weekly_standings = get_weekly_standings(season.id, season.current_week, division_id)
+    cumulative_standings = get_cumulative_standings(season.id, division_id)
     
     return render_template('home.html', 
                          season=season,
+                         divisions=divisions,
+                         division=division,
                          players=players, 
                          current_week_matches=current_week_matches,
                          weekly_standings=weekly_standings,
                          cumulative_standings=cumulative_standings)
 
 @app.route('/manage_players', methods=['GET', 'POST'])
+@serialized_write
 def manage_players():
     if request.method == 'POST':
         player_name = request.form.get('player_name')
@@ -140,168 +1264,467 @@ def manage_players():
             else:
                 existing_player.is_active = True
                 db.session.commit()
+                standings_cache.invalidate()
                 flash(f'{player_name} réactivé !', 'success')
         else:
-            # Vérifier qu'on n'a pas plus de 5 joueurs actifs
-            active_count = Player.query.filter_by(is_active=True).count()
-            if active_count >= 5:
-                flash('Maximum 5 joueurs actifs autorisés', 'error')
-                return redirect(url_for('manage_players'))
-            
-            # Créer un nouveau joueur
-            new_player = Player(name=player_name, is_active=True)
+            # Créer un nouveau joueur dans la division choisie (la plus basse par défaut)
+            division = db.session.get(Division, request.form.get('division_id', type=int) or 0)
+            if division is None:
+                division = default_division()
+            new_player = Player(name=player_name, is_active=True, division=division)
             db.session.add(new_player)
             db.session.commit()
+            standings_cache.invalidate()
             flash(f'{player_name} ajouté !', 'success')
         
         return redirect(url_for('manage_players'))
     
     # Récupérer tous les joueurs
-    active_players = Player.query.filter_by(is_active=True).all()
+    active_players = Player.query.options(joinedload(Player.division)).filter_by(
+        is_active=True).order_by(Player.division_id, Player.name).all()
     inactive_players = Player.query.filter_by(is_active=False).all()
     
     return render_template('manage_players.html', 
+                         divisions=get_divisions(),
                          active_players=active_players,
                          inactive_players=inactive_players)
 
+@app.route('/divisions', methods=['POST'])
+@serialized_write
+def add_division():
+    name = request.form.get('division_name')
+    if not name:
+        flash('Le nom de la division est requis', 'error')
+        return redirect(url_for('manage_players'))
+    
+    if Division.query.filter_by(name=name).first():
+        flash('Cette division existe déjà', 'error')
+        return redirect(url_for('manage_players'))
+    
+    # Nouvelle division sous la plus basse existante
+    lowest_level = db.session.scalar(db.select(func.max(Division.level))) or 0
+    db.session.add(Division(name=name, level=lowest_level + 1))
+    db.session.commit()
+    standings_cache.invalidate()
+    
+    flash(f'{name} créée !', 'success')
+    return redirect(url_for('manage_players'))
+
+@app.route('/move_player/<int:player_id>', methods=['POST'])
+@serialized_write
+def move_player(player_id):
+    player = Player.query.get_or_404(player_id)
+    division = db.session.get(Division, request.form.get('division_id', type=int) or 0)
+    if division is None:
+        flash('Division inconnue', 'error')
+        return redirect(url_for('manage_players'))
+    
+    player.division = division
+    db.session.commit()
+    standings_cache.invalidate()
+    
+    flash(f'{player.name} → {division.name}', 'success')
+    return redirect(url_for('manage_players'))
+
 @app.route('/generate_week')
+@serialized_write
 def generate_week():
-    season = Season.query.filter_by(is_active=True).first()
+    season = get_active_season(fresh=True)
     if not season:
         flash('Aucune saison active', 'error')
         return redirect(url_for('home'))
     
-    # Vérifier qu'il y a exactement 5 joueurs actifs
+    # Il faut au moins 2 joueurs actifs
     active_players = Player.query.filter_by(is_active=True).count()
-    if active_players != 5:
-        flash('Il faut exactement 5 joueurs actifs', 'error')
+    if active_players < 2:
+        flash('Il faut au moins 2 joueurs actifs', 'error')
         return redirect(url_for('manage_players'))
     
     # Vérifier si la semaine actuelle a déjà des matchs
     existing_matches = Match.query.filter_by(
         season_id=season.id, 
-        week_number=season.current_week
+        week_number=season.current_week,
+        tournament_id=None
     ).first()
     
     if existing_matches:
         flash('Les matchs de cette semaine existent déjà', 'error')
         return redirect(url_for('home'))
     
-    # Générer les matchs de la semaine (4 matchs par joueur)
-    generate_weekly_matches(season.id, season.current_week)
+    # Générer les matchs de la semaine (journées suivantes du championnat de chaque division)
+    created = generate_weekly_matches(season.id, season.current_week)
+    standings_cache.invalidate()
     
-    flash(f'Semaine {season.current_week} générée ! Chaque joueur a 4 matchs.', 'success')
+    flash(f'Semaine {season.current_week} générée ! {created} matchs créés.', 'success')
     return redirect(url_for('home'))
 
 @app.route('/week/<int:week_number>')
+@conditional_get
 def view_week(week_number):
-    season = Season.query.filter_by(is_active=True).first()
+    season = get_active_season()
     if not season:
         flash('Aucune saison active', 'error')
         return redirect(url_for('home'))
     
-    # Récupérer les matchs de la semaine
-    matches = Match.query.filter_by(
-        season_id=season.id,
-        week_number=week_number
-    ).order_by(Match.match_number).all()
+    divisions = get_cached_divisions()
+    division = resolve_viewer_division(divisions)
+    division_id = division.id if division else None
     
-    # Calculer les statistiques de la semaine
-    weekly_standings = calculate_weekly_standings(season.id, week_number)
+    # Matchs et classement de la semaine (depuis le cache)
+    matches = get_week_matches(season.id, week_number, division_id)
+    weekly_standings = get_weekly_standings(season.id, week_number, division_id)
     
     return render_template('week_view.html', 
                          season=season,
+                         divisions=divisions,
+                         division=division,
                          matches=matches,
                          week_number=week_number,
                          weekly_standings=weekly_standings)
 
 @app.route('/standings')
+@conditional_get
 def standings():
-    season = Season.query.filter_by(is_active=True).first()
+    season = get_active_season()
     if not season:
         flash('Aucune saison active', 'error')
         return redirect(url_for('home'))
     
-    # Calculer les classements
-    weekly_standings = calculate_weekly_standings(season.id, season.current_week)
-    cumulative_standings = calculate_cumulative_standings(season.id)
+    divisions = get_cached_divisions()
+    division = resolve_viewer_division(divisions)
+    division_id = division.id if division else None
+    
+    # Classements de la division (depuis le cache)
+    weekly_standings = get_weekly_standings(season.id, season.current_week, division_id)
+    cumulative_standings = get_cumulative_standings(season.id, division_id)
+    odds = get_season_odds(season.id, division_id)
     
     return render_template('standings.html',
                          season=season,
+                         divisions=divisions,
+                         division=division,
                          weekly_standings=weekly_standings,
-                         cumulative_standings=cumulative_standings)
+                         cumulative_standings=cumulative_standings,
+                         odds=odds)
 
 @app.route('/update_match/<int:match_id>', methods=['POST'])
+@serialized_write
 def update_match(match_id):
-    match = Match.query.get_or_404(match_id)
+    # Mêmes contrôles que la saisie groupée : score absent, non entier ou négatif refusé
+    results, errors = validate_score_batch([(match_id, request.form.get('score1'), request.form.get('score2'))])
+    match = results[0][0] if results else Match.query.get_or_404(match_id)
+    if match.bracket_slot is not None:
+        return update_knockout_match(match_id)
+    tournament = match.tournament
     
-    score1 = int(request.form.get('score1'))
-    score2 = int(request.form.get('score2'))
+    if errors:
+        for error in errors:
+            flash(error, 'error')
+        return redirect(url_for('home') if tournament is None else url_for('tournament_home'))
+    _, score1, score2 = results[0]
     
-    match.player1_score = score1
-    match.player2_score = score2
+    # Score, éliminations et journée suivante dans une seule transaction
+    record_match_score(match, score1, score2)
+    messages = advance_tournaments([match])
+    db.session.commit()
+    standings_cache.invalidate()
+    publish_score_changes([match])
     
-    # Déterminer le gagnant
-    if score1 > score2:
-        match.winner_id = match.player1_id
-    elif score2 > score1:
-        match.winner_id = match.player2_id
-    # Pas de winner_id si égalité (match nul)
+    # Match de ligue : les classements sont déjà à jour
+    if tournament is None:
+        flash(f'✅ Score enregistré : {match.player1.name} {score1} - {score2} {match.player2.name}', 'success')
+        return redirect(url_for('home'))
     
-    db.session.commit()
+    for message in messages:
+        flash(message, 'success')
+    return redirect(url_for('tournament_home'))
+
+def _parse_score_batch():
+    """Lit une liste de (match_id, score1, score2) depuis du JSON ou un formulaire"""
+    if request.is_json:
+        payload = request.get_json(silent=True)
+        if isinstance(payload, dict):
+            payload = payload.get('results')
+        if not isinstance(payload, list):
+            return None
+        return [(item.get('match_id'), item.get('score1'), item.get('score2'))
+                if isinstance(item, dict) else (None, None, None) for item in payload]
     
-    # Vérifier si tous les matchs de la journée sont terminés
-    tournament = match.tournament
-    round_matches = Match.query.filter_by(
-        tournament_id=tournament.id,
-        round_number=match.round_number
-    ).all()
+    # Formulaire : match_ids[] + score1_<id> / score2_<id> ; les lignes vides sont ignorées
+    entries = []
+    for match_id in request.form.getlist('match_ids[]'):
+        score1 = request.form.get(f'score1_{match_id}', '').strip()
+        score2 = request.form.get(f'score2_{match_id}', '').strip()
+        if score1 or score2:
+            entries.append((match_id, score1, score2))
+    return entries
+
+def _parse_integer(value):
+    """Entier strict : int JSON (ni booléen ni flottant) ou chaîne de chiffres ; None sinon"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        text = value.strip()
+        digits = text[1:] if text.startswith('-') else text
+        if digits.isascii() and digits.isdigit():
+            return int(text)
+    return None
+
+def validate_score_batch(entries):
+    """Valide un lot de scores en une requête ; retourne (résultats, erreurs)
     
-    all_finished = all(m.player1_score is not None and m.player2_score is not None for m in round_matches)
+    Un score est un entier : 1.7, true ou "2.0" sont refusés plutôt qu'arrondis.
+    """
+    errors = []
+    parsed = []
+    seen = set()
+    for index, entry in enumerate(entries, 1):
+        match_id, score1, score2 = (_parse_integer(value) for value in entry)
+        if match_id is None or score1 is None or score2 is None:
+            errors.append(f'Ligne {index} : identifiant ou score invalide')
+            continue
+        if score1 < 0 or score2 < 0:
+            errors.append(f'Match {match_id} : les scores doivent être positifs')
+        elif match_id in seen:
+            errors.append(f'Match {match_id} : présent plusieurs fois')
+        else:
+            seen.add(match_id)
+            parsed.append((match_id, score1, score2))
     
-    if all_finished:
-        # Vérifier combien de joueurs étaient en lice avant cette journée
-        players_before = TournamentPlayer.query.filter_by(
-            tournament_id=tournament.id,
-            is_eliminated=False
-        ).count()
-        
-        # Si c'était la finale (2 joueurs), le tournoi est terminé
-        if players_before == 2:
-            tournament.status = 'finished'
-            db.session.commit()
-            flash('🏆 Tournoi terminé ! Nous avons un champion !', 'success')
+    matches = {m.id: m for m in Match.query.filter(Match.id.in_(seen))} if seen else {}
+    results = []
+    for match_id, score1, score2 in parsed:
+        match = matches.get(match_id)
+        if match is None:
+            errors.append(f'Match {match_id} : introuvable')
+        elif match.tournament_id is not None and match.is_completed:
+            errors.append(f'Match {match_id} : score de tournoi déjà enregistré')
+        elif match.bracket_slot is not None and score1 == score2:
+            errors.append(f'Match {match_id} : pas de match nul en élimination directe')
         else:
-            # Éliminer les joueurs avec le moins de victoires
-            eliminate_players(tournament.id, match.round_number)
-            
-            # Vérifier combien de joueurs restent après élimination
-            remaining_players = TournamentPlayer.query.filter_by(
-                tournament_id=tournament.id,
-                is_eliminated=False
-            ).count()
-            
-            if remaining_players == 2:
-                # Générer le match de finale
-                tournament.current_round += 1
-                db.session.commit()
-                generate_final_match(tournament.id, tournament.current_round)
-                flash('🔥 Finale générée ! Le match décisif !', 'success')
-            elif remaining_players > 2:
-                # Générer la prochaine journée
-                tournament.current_round += 1
-                db.session.commit()
-                generate_round_matches(tournament.id, tournament.current_round)
-                flash(f'✅ Journée {tournament.current_round} générée ! {remaining_players} joueurs restants.', 'success')
-            else:
-                # Erreur - ne devrait pas arriver
-                tournament.status = 'finished'
-                db.session.commit()
-                flash('Tournoi terminé de façon inattendue !', 'error')
+            results.append((match, score1, score2))
+    return results, errors
+
+@app.route('/update_matches', methods=['POST'])
+@serialized_write
+def update_matches():
+    """Saisie groupée des scores : validation globale puis une seule transaction"""
+    entries = _parse_score_batch()
+    if entries is None:
+        return jsonify(errors=['Format attendu : liste de {match_id, score1, score2}']), 400
+    
+    results, errors = validate_score_batch(entries)
+    if not errors and not results:
+        errors.append('Aucun score à enregistrer')
+    
+    if errors:
+        if request.is_json:
+            return jsonify(errors=errors), 400
+        for error in errors:
+            flash(error, 'error')
+        return redirect(request.referrer or url_for('home'))
+    
+    corrected = sum(1 for match, _, _ in results if match.is_completed)
+    record_match_scores(results)
+    messages = advance_tournaments([match for match, _, _ in results])
+    db.session.commit()
+    standings_cache.invalidate()
+    publish_score_changes([match for match, _, _ in results])
+    
+    if request.is_json:
+        return jsonify(
+            updated=len(results),
+            corrected=corrected,
+            matches=[{'match_id': m.id, 'score1': m.player1_score, 'score2': m.player2_score}
+                     for m, _, _ in results]
+        )
     
-    return redirect(url_for('tournament_round', round_number=match.round_number))
+    flash(f'✅ {len(results)} score(s) enregistré(s)', 'success')
+    for message in messages:
+        flash(message, 'success')
+    return redirect(request.referrer or url_for('home'))
+
+@app.route('/tournament')
+@conditional_get
+def tournament_home():
+    tournament = get_current_tournament()
+    if not tournament:
+        flash('Aucun tournoi : lancez-en un depuis la gestion des joueurs', 'error')
+        return redirect(url_for('manage_players'))
+    if tournament.status == 'finished':
+        return redirect(url_for('tournament_standings'))
+    return redirect(url_for('tournament_round', round_number=tournament.current_round))
+
+@app.route('/tournament/start', methods=['POST'])
+@serialized_write
+def new_tournament():
+    season = get_active_season(fresh=True)
+    if not season:
+        flash('Aucune saison active', 'error')
+        return redirect(url_for('home'))
+    
+    current = get_current_tournament()
+    if current and current.status == 'in_progress':
+        flash('Un tournoi est déjà en cours', 'error')
+        return redirect(url_for('tournament_home'))
+    
+    player_ids = db.session.scalars(
+        db.select(Player.id).where(Player.is_active.is_(True)).order_by(Player.id)
+    ).all()
+    if len(player_ids) < 2:
+        flash('Il faut au moins 2 joueurs actifs', 'error')
+        return redirect(url_for('manage_players'))
+    
+    name = request.form.get('tournament_name', '').strip() or f'Tournoi {season.name}'
+    tournament = start_tournament(season, name, player_ids)
+    db.session.commit()
+    standings_cache.invalidate()
+    
+    flash(f'🏆 {tournament.name} lancé avec {len(player_ids)} joueurs !', 'success')
+    return redirect(url_for('tournament_round', round_number=1))
+
+@app.route('/tournament/round/<int:round_number>')
+@conditional_get
+def tournament_round(round_number):
+    tournament = get_current_tournament()
+    if not tournament:
+        return redirect(url_for('tournament_home'))
+    
+    matches = Match.query.options(
+        joinedload(Match.player1), joinedload(Match.player2), joinedload(Match.winner)
+    ).filter_by(tournament_id=tournament.id, round_number=round_number).order_by(Match.match_number).all()
+    if not matches:
+        flash(f'Pas de journée {round_number} dans ce tournoi', 'error')
+        return redirect(url_for('tournament_home'))
+    
+    current_standings = calculate_tournament_standings(tournament.id)
+    # Joueurs encore en lice au début de cette journée
+    active_players = [s['entry'] for s in current_standings
+                      if not s['is_eliminated'] or s['elimination_round'] >= round_number]
+    
+    return render_template('tournament_round.html',
+                         tournament=tournament,
+                         round_number=round_number,
+                         matches=matches,
+                         active_players=active_players,
+                         current_standings=current_standings)
+
+@app.route('/tournament/standings')
+@conditional_get
+def tournament_standings():
+    tournament = get_current_tournament()
+    if not tournament:
+        return redirect(url_for('tournament_home'))
+    
+    return render_template('tournament_standings.html',
+                         tournament=tournament,
+                         standings=calculate_tournament_standings(tournament.id))
+
+@app.route('/knockout')
+@conditional_get
+def knockout():
+    tournament = get_current_tournament('knockout')
+    if not tournament:
+        flash('Aucune phase éliminatoire : lancez-en une depuis la gestion des joueurs', 'error')
+        return redirect(url_for('manage_players'))
+    
+    bracket = load_bracket(tournament)
+    # Tours avant les quarts, seulement pour les tableaux de plus de 8 joueurs
+    early_stages = []
+    level = len(bracket) // 2
+    while level > 4:
+        early_stages.append((knockout_stage_name(level), level, bracket_stage(bracket, level)))
+        level //= 2
+    
+    return render_template('knockout.html',
+                         tournament=tournament,
+                         early_stages=early_stages,
+                         quarter_matches=bracket_stage(bracket, 4),
+                         semi_matches=bracket_stage(bracket, 2),
+                         final_match=bracket[1] if len(bracket) > 1 else None)
+
+@app.route('/knockout/start', methods=['POST'])
+@serialized_write
+def new_knockout():
+    season = get_active_season(fresh=True)
+    if not season:
+        flash('Aucune saison active', 'error')
+        return redirect(url_for('home'))
+    
+    current = get_current_tournament('knockout')
+    if current and current.status == 'in_progress':
+        flash('Une phase éliminatoire est déjà en cours', 'error')
+        return redirect(url_for('knockout'))
+    
+    # Têtes de série : division la plus haute d'abord, puis rang au classement cumulé
+    levels = {division.id: division.level for division in get_divisions()}
+    seeds = sorted(load_cumulative_standings(season.id),
+                   key=lambda standing: levels.get(standing['player'].division_id, len(levels) + 1))
+    if len(seeds) < 2:
+        flash('Il faut au moins 2 joueurs actifs', 'error')
+        return redirect(url_for('manage_players'))
+    
+    # Le tableau prend la plus grande puissance de deux de joueurs disponibles
+    size = 1 << (len(seeds).bit_length() - 1)
+    name = request.form.get('tournament_name', '').strip() or f'Phase finale {season.name}'
+    tournament = start_knockout(season, name, [standing['player'].id for standing in seeds[:size]])
+    db.session.commit()
+    standings_cache.invalidate()
+    
+    flash(f'🏆 {tournament.name} lancée : {size} qualifiés', 'success')
+    if len(seeds) > size:
+        flash(f'{len(seeds) - size} joueur(s) non qualifié(s) pour le tableau', 'success')
+    return redirect(url_for('knockout'))
+
+def _settle_knockout_scores(entries, level=None):
+    """Enregistre des scores du tableau en une transaction, limités à un tour si level est donné"""
+    results, errors = validate_score_batch(entries)
+    for match, _, _ in results:
+        if match.bracket_slot is None:
+            errors.append(f'Match {match.id} : ne fait pas partie du tableau')
+        elif level is not None and stage_level(match.bracket_slot) != level:
+            errors.append(f'Match {match.id} : hors de ce tour')
+    if not errors and not results:
+        errors.append('Aucun score à enregistrer')
+    
+    if errors:
+        for error in errors:
+            flash(error, 'error')
+        return redirect(url_for('knockout'))
+    
+    record_match_scores(results)
+    messages = advance_tournaments([match for match, _, _ in results])
+    db.session.commit()
+    standings_cache.invalidate()
+    
+    flash(f'✅ {len(results)} score(s) enregistré(s)', 'success')
+    for message in messages:
+        flash(message, 'success')
+    return redirect(url_for('knockout'))
+
+@app.route('/knockout/match/<int:match_id>', methods=['POST'])
+@serialized_write
+def update_knockout_match(match_id):
+    return _settle_knockout_scores([(match_id, request.form.get('score1'), request.form.get('score2'))])
+
+@app.route('/knockout/stage/<int:level>', methods=['POST'])
+@serialized_write
+def update_knockout_stage(level):
+    """Valide tous les scores d'un tour en une fois"""
+    return _settle_knockout_scores(_parse_score_batch() or [], level)
+
+@app.route('/knockout/quarters', methods=['POST'])
+def update_all_quarters():
+    return update_knockout_stage(4)
+
+@app.route('/knockout/semis', methods=['POST'])
+def update_all_semis():
+    return update_knockout_stage(2)
 
 @app.route('/toggle_player/<int:player_id>')
+@serialized_write
 def toggle_player(player_id):
     player = Player.query.get_or_404(player_id)
     
@@ -310,20 +1733,19 @@ def toggle_player(player_id):
         player.is_active = False
         flash(f'{player.name} désactivé', 'success')
     else:
-        # Vérifier qu'on n'a pas déjà 5 joueurs actifs
-        active_count = Player.query.filter_by(is_active=True).count()
-        if active_count >= 5:
-            flash('Maximum 5 joueurs actifs autorisés', 'error')
-        else:
-            player.is_active = True
-            flash(f'{player.name} activé', 'success')
+        player.is_active = True
+        if player.division_id is None:
+            player.division = default_division()
+        flash(f'{player.name} activé', 'success')
     
     db.session.commit()
+    standings_cache.invalidate()
     return redirect(url_for('manage_players'))
 
 @app.route('/next_week')
+@serialized_write
 def next_week():
-    season = Season.query.filter_by(is_active=True).first()
+    season = get_active_season(fresh=True)
     if not season:
         flash('Aucune saison active', 'error')
         return redirect(url_for('home'))
@@ -331,7 +1753,8 @@ def next_week():
     # Vérifier que tous les matchs de la semaine actuelle sont terminés
     current_week_matches = Match.query.filter_by(
         season_id=season.id,
-        week_number=season.current_week
+        week_number=season.current_week,
+        tournament_id=None
     ).all()
     
     if not all(m.is_completed for m in current_week_matches):
@@ -341,17 +1764,30 @@ def next_week():
     # Passer à la semaine suivante
     season.current_week += 1
     db.session.commit()
+    invalidate_active_season()
+    standings_cache.invalidate()
     
     flash(f'🚀 Passage à la semaine {season.current_week}', 'success')
     return redirect(url_for('home'))
 
 @app.route('/new_season')
+@serialized_write
 def new_season():
     # Terminer la saison actuelle
-    current_season = Season.query.filter_by(is_active=True).first()
+    current_season = get_active_season(fresh=True)
     if current_season:
+        # Promotions et relégations d'après le classement final
+        moves = apply_promotion_relegation(current_season.id)
         current_season.is_active = False
         current_season.status = 'finished'
+        try:
+            freeze_season(current_season, moves)
+        except ValueError as error:
+            db.session.rollback()
+            flash(f'❌ {error}', 'error')
+            return redirect(url_for('home'))
+        if moves:
+            flash(f'🔁 {len(moves)} joueur(s) changent de division', 'success')
     
     # Créer une nouvelle saison
     new_season = Season(
@@ -362,22 +1798,220 @@ def new_season():
         status='in_progress'
     )
     db.session.add(new_season)
-        db.session.commit()
+    db.session.flush()
+    # Effectif figé dès le début, après les promotions et relégations
+    season_roster(new_season.id)
+    db.session.commit()
+    invalidate_active_season()
+    standings_cache.invalidate()
     
     flash(f'🎉 Nouvelle saison créée : {new_season.name}', 'success')
     return redirect(url_for('home'))
 
 @app.route('/season_history')
+@conditional_get
 def season_history():
-    # Récupérer toutes les saisons (active et archivées)
-    all_seasons = Season.query.order_by(Season.start_date.desc()).all()
-    active_season = Season.query.filter_by(is_active=True).first()
+    try:
+        cursor = parse_season_cursor(request.args.get('cursor'))
+    except ValueError:
+        flash('Page d\'historique introuvable', 'error')
+        return redirect(url_for('season_history'))
+    
+    # Une page de saisons (la suivante commence après la dernière affichée) et leurs bilans figés
+    page_size = app.config['SEASON_HISTORY_PAGE_SIZE']
+    query = (
+        db.select(Season, SeasonSnapshot)
+        .outerjoin(SeasonSnapshot, SeasonSnapshot.season_id == Season.id)
+        .options(defer(SeasonSnapshot.data))
+        .order_by(Season.start_date.desc(), Season.id.desc())
+        .limit(page_size + 1)
+    )
+    if cursor:
+        query = query.where(db.tuple_(Season.start_date, Season.id) < cursor)
+    rows = db.session.execute(query).all()
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = season_cursor(rows[-1][0])
+    
+    seasons = [season for season, _ in rows]
+    summaries = {season.id: snapshot for season, snapshot in rows if snapshot}
+    # Saisons de la page sans bilan (la saison en cours) : agrégées ensemble en une requête groupée
+    summaries.update(season_totals_by_id([season.id for season in seasons if season.id not in summaries]))
     
     return render_template('season_history.html', 
-                         seasons=all_seasons,
-                         active_season=active_season)
+                         seasons=seasons,
+                         summaries=summaries,
+                         counts=season_counts(),
+                         cursor=cursor,
+                         next_cursor=next_cursor,
+                         active_season=get_active_season())
+
+@app.route('/season/<int:season_id>')
+@conditional_get
+def season_archive(season_id):
+    """Classement final et palmarès d'une saison terminée, lus depuis son bilan figé"""
+    row = db.session.execute(
+        db.select(Season, SeasonSnapshot)
+        .outerjoin(SeasonSnapshot, SeasonSnapshot.season_id == Season.id)
+        .where(Season.id == season_id)
+    ).first()
+    if row is None:
+        abort(404)
+    season, snapshot = row
+    if snapshot is None:
+        flash('Cette saison n\'a pas encore de bilan : elle est en cours ou doit être figée', 'error')
+        return redirect(url_for('season_history'))
+    
+    return render_template('season_archive.html',
+                         season=season,
+                         snapshot=snapshot,
+                         archive=snapshot.payload)
+
+@app.route('/head_to_head')
+@conditional_get
+def head_to_head():
+    """Matrice des confrontations d'une saison (active par défaut) ou de tout l'historique"""
+    scope = request.args.get('season')
+    if scope == 'all':
+        season = None
+    elif scope:
+        season = db.session.get(Season, scope) if scope.isdigit() else None
+        if season is None:
+            abort(404)
+    else:
+        season = get_active_season()
+    
+    matrix = get_head_to_head(season.id if season else None)
+    
+    if request.args.get('format') == 'json':
+        return jsonify(
+            season_id=season.id if season else None,
+            players=[player._asdict() for player in matrix.players],
+            records=[dict(record._asdict(), player_id=player_id, opponent_id=opponent_id,
+                          points=record.points)
+                     for (player_id, opponent_id), record in sorted(matrix.records.items())]
+        )
+    
+    return render_template('head_to_head.html',
+                         scope_season=season,
+                         matrix=matrix)
+
+@app.route('/ratings')
+@conditional_get
+def ratings():
+    """Classement Elo de tous les joueurs actifs, toutes saisons confondues"""
+    players = Player.query.filter_by(is_active=True).order_by(Player.rating.desc(), Player.name).all()
+    
+    if request.args.get('format') == 'json':
+        return jsonify(players=[{'id': player.id, 'name': player.name, 'rating': round(player.rating, 1),
+                                 'card_rating': player.card_rating} for player in players])
+    
+    season = get_active_season()
+    stats = {}
+    if season:
+        stats = {standing['player'].id: standing for standing in get_cumulative_standings(season.id)}
+    return render_template('ratings.html', players=players, stats=stats)
+
+@app.route('/ratings/<int:player_id>')
+@conditional_get
+def player_rating_history(player_id):
+    """Historique Elo d'un joueur au format JSON"""
+    player = db.get_or_404(Player, player_id)
+    return jsonify(player_id=player.id, name=player.name, rating=round(player.rating, 1),
+                   history=rating_history(player.id))
+
+@app.route('/export/<dataset>')
+def export(dataset):
+    """Export en flux (CSV ou JSONL) des saisons, des matchs ou des classements"""
+    if dataset not in EXPORT_DATASETS:
+        abort(404)
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify(errors=['Format attendu : csv ou jsonl']), 400
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError:
+        return jsonify(errors=['Paramètre since attendu au format ISO 8601 (ex. 2025-01-31T12:00:00)']), 400
+    
+    mimetype, writer = EXPORT_FORMATS[fmt]
+    fields, rows = EXPORT_DATASETS[dataset](since)
+    return Response(
+        stream_with_context(writer(fields, rows)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={dataset}.{fmt}'}
+    )
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Ressource à empreinte, en cache immuable, précompressée selon Accept-Encoding"""
+    path = safe_join(ASSET_OUTPUT_DIR, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    
+    encoding = None
+    for candidate, suffix in assets.ENCODINGS:
+        if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+    
+    response = send_file(path, mimetype=mimetypes.guess_type(filename)[0], max_age=ASSET_MAX_AGE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Compteurs et histogrammes de tous les workers au format texte de Prometheus"""
+    return Response(metrics_registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/events')
+def events():
+    """Flux SSE des scores et classements, repris après ?since=<id> ou Last-Event-ID
+    
+    Le flux se ferme après LIVE_STREAM_DURATION : le navigateur se reconnecte seul, ce qui
+    libère régulièrement les threads des workers et survit à leur redémarrage.
+    """
+    after_id = request.headers.get('Last-Event-ID', type=int)
+    if after_id is None:
+        after_id = request.args.get('since', type=int)
+    if after_id is None:
+        after_id = change_broker.latest_id()
+    else:
+        change_broker.start()
+    heartbeat = app.config['LIVE_HEARTBEAT']
+    deadline = time.monotonic() + app.config['LIVE_STREAM_DURATION']
+    
+    def stream():
+        cursor = after_id
+        yield f'retry: {int(app.config["LIVE_POLL_INTERVAL"] * 1000) + 1000}\n\n'
+        while time.monotonic() < deadline:
+            changes = change_broker.wait(cursor, min(heartbeat, max(deadline - time.monotonic(), 0)))
+            if changes is None:
+                # Hors de la mémoire du worker : rattrapage depuis le journal
+                with app.app_context():
+                    changes = load_changes(cursor)
+                if changes is None:
+                    yield 'event: reload\ndata: {}\n\n'
+                    return
+            if not changes:
+                yield ': ping\n\n'
+            for change in changes:
+                yield f'id: {change.id}\nevent: {change.kind}\ndata: {change.payload}\n\n'
+                cursor = change.id
+    
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Pas de mise en tampon par un éventuel proxy nginx
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 @app.route('/update_player_names')
+@serialized_write
 def update_player_names():
     """Met à jour les noms des joueurs avec les vrais noms"""
     try:
@@ -401,7 +2035,7 @@ def update_player_names():
                 if not existing_new_player:
                     player.name = new_name
                     updated_count += 1
-    else:
+                else:
                     # Si le nouveau nom existe déjà, supprimer l'ancien
                     db.session.delete(player)
         
@@ -410,11 +2044,12 @@ def update_player_names():
         for name in real_names:
             existing_player = Player.query.filter_by(name=name).first()
             if not existing_player:
-                new_player = Player(name=name, is_active=True)
+                new_player = Player(name=name, is_active=True, division=default_division())
                 db.session.add(new_player)
                 updated_count += 1
         
         db.session.commit()
+        standings_cache.invalidate()
         
         flash(f'✅ {updated_count} joueurs mis à jour avec les vrais noms !', 'success')
         return redirect(url_for('manage_players'))
@@ -441,181 +2076,344 @@ def initialize_default_players():
     for player_name in default_players:
         existing_player = Player.query.filter_by(name=player_name).first()
         if not existing_player:
-            player = Player(name=player_name, is_active=True)
+            player = Player(name=player_name, is_active=True, division=default_division())
             db.session.add(player)
     
     db.session.commit()
 
-def generate_weekly_matches(season_id, week_number):
-    """Génère les matchs d'une semaine - chaque joueur joue 4 matchs"""
-    players = Player.query.filter_by(is_active=True).all()
+@lru_cache(maxsize=64)
+def round_robin_schedule(player_count, legs=1):
+    """Journées d'un championnat toutes rondes, par la méthode du cercle
     
-    if len(players) != 5:
-        return False
+    Retourne un tuple de journées, chacune un tuple de paires d'indices
+    (domicile, extérieur). Avec un nombre impair de joueurs, un exempt est
+    ajouté : son adversaire du jour est au repos. En aller-retour (legs=2),
+    la phase retour inverse domicile et extérieur.
+    """
+    slots = list(range(player_count))
+    if player_count % 2:
+        slots.append(None)
+    size = len(slots)
     
-    # Créer toutes les combinaisons possibles (10 matchs au total)
-    all_matches = []
-    for i in range(len(players)):
-        for j in range(i + 1, len(players)):
-            all_matches.append((players[i], players[j]))
-    
-    # Mélanger et sélectionner 10 matchs pour que chaque joueur joue 4 fois
-    random.shuffle(all_matches)
-    
-    # Compter les matchs par joueur
-    player_count = {player.id: 0 for player in players}
-    selected_matches = []
-    
-    # Sélectionner les matchs pour que chaque joueur ait exactement 4 matchs
-    for player1, player2 in all_matches:
-        if player_count[player1.id] < 4 and player_count[player2.id] < 4:
-            selected_matches.append((player1, player2))
-            player_count[player1.id] += 1
-            player_count[player2.id] += 1
-            
-            # Si on a 10 matchs (5 joueurs * 4 matchs / 2), on s'arrête
-            if len(selected_matches) == 10:
-                break
-    
-    # Créer les matchs en base
-    for i, (player1, player2) in enumerate(selected_matches, 1):
-        match = Match(
-            season_id=season_id,
-            week_number=week_number,
-            match_number=i,
-            player1_id=player1.id,
-            player2_id=player2.id
-        )
-        db.session.add(match)
+    rounds = []
+    for round_index in range(size - 1):
+        pairs = []
+        for i in range(size // 2):
+            home, away = slots[i], slots[size - 1 - i]
+            if home is None or away is None:
+                continue
+            # Le joueur fixe alterne domicile/extérieur d'une journée à l'autre
+            if i == 0 and round_index % 2:
+                home, away = away, home
+            pairs.append((home, away))
+        rounds.append(tuple(pairs))
+        # Rotation de tous les joueurs sauf le premier
+        slots = [slots[0], slots[-1]] + slots[1:-1]
     
-    db.session.commit()
-    return True
+    if legs == 2:
+        rounds += [tuple((away, home) for home, away in pairs) for pairs in rounds]
+    return tuple(rounds)
 
-def calculate_weekly_standings(season_id, week_number):
-    """Calcule les statistiques d'une semaine spécifique"""
-    players = Player.query.filter_by(is_active=True).all()
-    standings = []
+def _rounds_per_week(rounds_per_week, schedule):
+    # 0 (ou au-delà du nombre de journées) : tout le championnat chaque semaine
+    if rounds_per_week <= 0:
+        return len(schedule)
+    return min(rounds_per_week, len(schedule))
+
+def build_week_fixtures(season_id, week_number, player_ids, legs=1, division_id=None, first_match_number=1,
+                        rounds_per_week=0):
+    """Lignes Match d'une semaine : les journées suivantes du championnat toutes rondes
     
-    for player in players:
-        # Récupérer les matchs de cette semaine
-        matches_p1 = Match.query.filter_by(
-            season_id=season_id,
-            week_number=week_number,
-            player1_id=player.id,
-            is_completed=True
-        ).all()
-        
-        matches_p2 = Match.query.filter_by(
-            season_id=season_id,
-            week_number=week_number,
-            player2_id=player.id,
-            is_completed=True
+    La semaine w joue les journées (w - 1) * rounds_per_week et suivantes, en boucle sur
+    le calendrier : une semaine coûte rounds_per_week journées quel que soit le nombre de
+    joueurs (0 = tout le calendrier). Chaque nouveau tour du calendrier inverse domicile
+    et extérieur.
+    """
+    schedule = round_robin_schedule(len(player_ids), legs)
+    rounds = _rounds_per_week(rounds_per_week, schedule)
+    first_round = (week_number - 1) * rounds
+    rows = []
+    for index in range(first_round, first_round + rounds):
+        cycle, round_index = divmod(index, len(schedule))
+        for home, away in schedule[round_index]:
+            if cycle % 2:
+                home, away = away, home
+            rows.append({
+                'season_id': season_id,
+                'division_id': division_id,
+                'week_number': week_number,
+                'match_number': first_match_number + len(rows),
+                'player1_id': player_ids[home],
+                'player2_id': player_ids[away]
+            })
+    return rows
+
+@app.template_global()
+def week_fixture_counts(player_count):
+    """(matchs de la semaine, matchs par joueur) d'une division de player_count joueurs"""
+    if player_count < 2:
+        return 0, 0
+    legs = app.config['ROUND_ROBIN_LEGS']
+    schedule = round_robin_schedule(player_count, legs)
+    rounds = _rounds_per_week(app.config['ROUNDS_PER_WEEK'], schedule)
+    # Calendrier complet : chaque joueur affronte tous les autres, exempt compris
+    per_player = legs * (player_count - 1) if rounds == len(schedule) else rounds
+    return rounds * (player_count // 2), per_player
+
+def season_roster(season_id):
+    """Identifiants des joueurs de la saison regroupés par division
+    
+    L'effectif est figé au début de la saison (joueurs actifs et leur division), pour
+    que l'index du calendrier reste le même de semaine en semaine : un joueur ajouté,
+    désactivé ou changé de division en cours de saison ne compte qu'à la suivante.
+    Une saison sans effectif (créée avant) le fige à sa première génération ; l'appelant
+    valide la transaction.
+    """
+    rows = db.session.execute(
+        db.select(SeasonPlayer.player_id, SeasonPlayer.division_id)
+        .where(SeasonPlayer.season_id == season_id)
+        .order_by(SeasonPlayer.division_id, SeasonPlayer.player_id)
+    ).all()
+    if not rows:
+        rows = db.session.execute(
+            db.select(Player.id, Player.division_id)
+            .where(Player.is_active.is_(True))
+            .order_by(Player.division_id, Player.id)
         ).all()
-        
-        wins = draws = losses = goals_for = goals_against = 0
-        
-        for match in matches_p1:
-                goals_for += match.player1_score
-                goals_against += match.player2_score
-                if match.player1_score > match.player2_score:
-                    wins += 1
-                elif match.player1_score == match.player2_score:
-                    draws += 1
-                else:
-                    losses += 1
-                    
-        for match in matches_p2:
-                goals_for += match.player2_score
-                goals_against += match.player1_score
-                if match.player2_score > match.player1_score:
-                    wins += 1
-                elif match.player2_score == match.player1_score:
-                    draws += 1
-                else:
-                    losses += 1
-        
-        matches_played = len(matches_p1) + len(matches_p2)
-        points = wins * 3 + draws
-        goal_average = goals_for / matches_played if matches_played > 0 else 0
-        
-        standings.append({
-            'player': player,
-            'matches_played': matches_played,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'goal_difference': goals_for - goals_against,
-            'points': points,
-            'goal_average': round(goal_average, 2)
-        })
-    
-    # Trier par points, puis par moyenne de buts, puis par différence de buts
-    standings.sort(key=lambda x: (x['points'], x['goal_average'], x['goal_difference']), reverse=True)
+        if rows:
+            db.session.execute(db.insert(SeasonPlayer), [
+                {'season_id': season_id, 'player_id': player_id, 'division_id': division_id}
+                for player_id, division_id in rows
+            ])
+    
+    players_by_division = defaultdict(list)
+    for player_id, division_id in rows:
+        players_by_division[division_id].append(player_id)
+    return players_by_division
+
+def _build_weeks(season_id, weeks):
+    """Calendrier de toutes les divisions pour les semaines demandées"""
+    players_by_division = season_roster(season_id)
+    legs, rounds_per_week = app.config['ROUND_ROBIN_LEGS'], app.config['ROUNDS_PER_WEEK']
+    rows = []
+    for week_number in weeks:
+        # Numérotation continue sur toutes les divisions d'une même semaine
+        week_rows = []
+        for division_id, player_ids in players_by_division.items():
+            if len(player_ids) < 2:
+                continue
+            week_rows.extend(build_week_fixtures(season_id, week_number, player_ids, legs,
+                                                 division_id, len(week_rows) + 1, rounds_per_week))
+        rows.extend(week_rows)
+    return rows
+
+@timed
+def generate_weekly_matches(season_id, week_number):
+    """Génère les matchs d'une semaine : les journées suivantes du championnat de chaque division"""
+    rows = _build_weeks(season_id, [week_number])
+    if rows:
+        db.session.execute(db.insert(Match), rows)
+        db.session.commit()
+    return len(rows)
+
+@timed
+def generate_season_fixtures(season_id, first_week, weeks):
+    """Précalcule le calendrier de plusieurs semaines et l'insère en une seule fois"""
+    rows = _build_weeks(season_id, range(first_week, first_week + weeks))
+    if rows:
+        db.session.execute(db.insert(Match), rows)
+        db.session.commit()
+    return len(rows)
+
+def _sides(*filters):
+    """Chaque match terminé vu des deux côtés : (joueur, adversaire, buts pour, buts contre)"""
+    filters = (Match.is_completed.is_(True),) + filters
+    home_side = db.select(
+        Match.player1_id.label('player_id'),
+        Match.player2_id.label('opponent_id'),
+        Match.player1_score.label('goals_for'),
+        Match.player2_score.label('goals_against')
+    ).where(*filters)
+    away_side = db.select(
+        Match.player2_id.label('player_id'),
+        Match.player1_id.label('opponent_id'),
+        Match.player2_score.label('goals_for'),
+        Match.player1_score.label('goals_against')
+    ).where(*filters)
+    return union_all(home_side, away_side).subquery('sides')
+
+def _match_sides(season_id, week_from=None, week_to=None):
+    """Côtés des matchs de championnat d'une saison, éventuellement bornés en semaines"""
+    filters = [Match.season_id == season_id, Match.tournament_id.is_(None)]
+    if week_from is not None:
+        filters.append(Match.week_number >= week_from)
+    if week_to is not None:
+        filters.append(Match.week_number <= week_to)
+    return _sides(*filters)
+
+def _side_totals(sides, *keys):
+    """Agrège les côtés de match par joueur (et autres clés) : MJ, V, N, D, buts pour et contre"""
+    goals_for = sides.c.goals_for
+    goals_against = sides.c.goals_against
+    group = (sides.c.player_id, *(sides.c[key] for key in keys))
+    return db.select(
+        *group,
+        func.count().label('matches_played'),
+        func.sum(case((goals_for > goals_against, 1), else_=0)).label('wins'),
+        func.sum(case((goals_for == goals_against, 1), else_=0)).label('draws'),
+        func.sum(case((goals_for < goals_against, 1), else_=0)).label('losses'),
+        func.sum(goals_for).label('goals_for'),
+        func.sum(goals_against).label('goals_against')
+    ).group_by(*group).subquery('totals')
+
+def _totals_columns(totals):
+    return (totals.c.matches_played, totals.c.wins, totals.c.draws, totals.c.losses,
+            totals.c.goals_for, totals.c.goals_against)
+
+def _standing_entry(player, matches_played, wins, draws, losses, gf, ga):
+    """Ligne de classement à partir des totaux agrégés (None quand le joueur n'a pas joué)"""
+    matches_played = matches_played or 0
+    wins = wins or 0
+    draws = draws or 0
+    gf = gf or 0
+    ga = ga or 0
+    goal_average = gf / matches_played if matches_played > 0 else 0
+    
+    return {
+        'player': player,
+        'matches_played': matches_played,
+        'wins': wins,
+        'draws': draws,
+        'losses': losses or 0,
+        'goals_for': gf,
+        'goals_against': ga,
+        'goal_difference': gf - ga,
+        'points': wins * 3 + draws,
+        'goal_average': round(goal_average, 2)
+    }
+
+@timed
+def compute_standings(season_id, week_from=None, week_to=None, division_id=None, tiebreak=None):
+    """Calcule le classement de tous les joueurs actifs en une seule requête agrégée
+    
+    Sans bornes de semaines, le classement couvre toute la saison. Sans division,
+    tous les joueurs sont classés d'un coup ; group_by_division() les répartit.
+    tiebreak remplace STANDINGS_TIEBREAK pour cet appel.
+    """
+    totals = _side_totals(_match_sides(season_id, week_from, week_to))
+    
+    rows = db.session.execute(
+        db.select(Player, *_totals_columns(totals))
+        .outerjoin(totals, totals.c.player_id == Player.id)
+        .where(Player.is_active.is_(True), *_division_filter(division_id))
+    ).all()
+    
+    standings = [_standing_entry(*row) for row in rows]
+    return rank_standings(standings, tiebreak,
+                          lambda: get_head_to_head(season_id, week_from, week_to))
+
+def _standing_key(standing):
+    return standing['points'], standing['goal_average'], standing['goal_difference']
+
+def rank_standings(standings, tiebreak=None, head_to_head=None):
+    """Trie un classement par points, puis moyenne de buts, puis différence de buts
+    
+    En mode 'head_to_head', les joueurs à égalité de points sont d'abord départagés par
+    le mini-classement de leurs confrontations directes. head_to_head() fournit la matrice
+    de la même période ; elle n'est demandée que s'il y a une égalité.
+    """
+    standings.sort(key=_standing_key, reverse=True)
+    if (tiebreak or app.config['STANDINGS_TIEBREAK']) != 'head_to_head' or head_to_head is None:
+        return standings
+    
+    matrix = None
+    ranked = []
+    for _, group in groupby(standings, key=lambda x: x['points']):
+        group = list(group)
+        if len(group) > 1:
+            matrix = matrix or head_to_head()
+            tied = [entry['player'].id for entry in group]
+            group.sort(key=lambda entry: (matrix.mini_league(entry['player'].id, tied), _standing_key(entry)),
+                       reverse=True)
+        ranked.extend(group)
+    standings[:] = ranked
     return standings
 
-def calculate_cumulative_standings(season_id):
+def _division_filter(division_id):
+    return [Player.division_id == division_id] if division_id is not None else []
+
+def group_by_division(standings):
+    """Répartit un classement global par division, en gardant l'ordre de chaque division"""
+    by_division = defaultdict(list)
+    for standing in standings:
+        by_division[standing['player'].division_id].append(standing)
+    return by_division
+
+@timed
+def calculate_weekly_standings(season_id, week_number, tiebreak=None):
+    """Calcule les statistiques d'une semaine spécifique"""
+    return compute_standings(season_id, week_from=week_number, week_to=week_number, tiebreak=tiebreak)
+
+@timed
+def calculate_cumulative_standings(season_id, tiebreak=None):
     """Calcule les statistiques cumulées depuis le début de la saison"""
-    players = Player.query.filter_by(is_active=True).all()
-    standings = []
+    return compute_standings(season_id, tiebreak=tiebreak)
+
+class HeadToHeadRecord(namedtuple('HeadToHeadRecord', 'matches_played wins draws losses goals_for goals_against')):
+    """Bilan d'un joueur contre un adversaire"""
+    __slots__ = ()
     
-    for player in players:
-        # Récupérer tous les matchs de la saison
-        matches_p1 = Match.query.filter_by(
-            season_id=season_id,
-            player1_id=player.id,
-            is_completed=True
-        ).all()
-        
-        matches_p2 = Match.query.filter_by(
-            season_id=season_id,
-            player2_id=player.id,
-            is_completed=True
-        ).all()
-        
-        wins = draws = losses = goals_for = goals_against = 0
-        
-        for match in matches_p1:
-            goals_for += match.player1_score
-            goals_against += match.player2_score
-    if match.player1_score > match.player2_score:
-                wins += 1
-            elif match.player1_score == match.player2_score:
-                draws += 1
+    @property
+    def points(self):
+        return self.wins * 3 + self.draws
+    
+    @property
+    def goal_difference(self):
+        return self.goals_for - self.goals_against
+
+NO_HEAD_TO_HEAD = HeadToHeadRecord(0, 0, 0, 0, 0, 0)
+
+class HeadToHead(namedtuple('HeadToHead', 'players records')):
+    """Matrice des confrontations : joueurs concernés et bilans indexés par (joueur, adversaire)"""
+    __slots__ = ()
+    
+    def record(self, player_id, opponent_id):
+        return self.records.get((player_id, opponent_id), NO_HEAD_TO_HEAD)
+    
+    def mini_league(self, player_id, opponent_ids):
+        """(points, différence, buts pour) d'un joueur contre un groupe d'adversaires"""
+        records = [self.record(player_id, opponent_id) for opponent_id in opponent_ids if opponent_id != player_id]
+        return (sum(record.points for record in records),
+                sum(record.goal_difference for record in records),
+                sum(record.goals_for for record in records))
+
+@timed
+def compute_head_to_head(season_id=None, week_from=None, week_to=None):
+    """Matrice complète des confrontations en une seule agrégation sur les matchs
+    
+    Sans saison, la matrice couvre tout l'historique du championnat (hors tournois).
+    """
+    if season_id is None:
+        sides = _sides(Match.tournament_id.is_(None))
     else:
-                losses += 1
-        
-        for match in matches_p2:
-            goals_for += match.player2_score
-            goals_against += match.player1_score
-            if match.player2_score > match.player1_score:
-                wins += 1
-            elif match.player2_score == match.player1_score:
-                draws += 1
-        else:
-                losses += 1
-        
-        matches_played = len(matches_p1) + len(matches_p2)
-        points = wins * 3 + draws
-        goal_average = goals_for / matches_played if matches_played > 0 else 0
-        
-        standings.append({
-            'player': player,
-            'matches_played': matches_played,
-            'wins': wins,
-            'draws': draws,
-            'losses': losses,
-            'goals_for': goals_for,
-            'goals_against': goals_against,
-            'goal_difference': goals_for - goals_against,
-            'points': points,
-            'goal_average': round(goal_average, 2)
-        })
-    
-    # Trier par points, puis par moyenne de buts, puis par différence de buts
-    standings.sort(key=lambda x: (x['points'], x['goal_average'], x['goal_difference']), reverse=True)
-    return standings
+        sides = _match_sides(season_id, week_from, week_to)
+    totals = _side_totals(sides, 'opponent_id')
+    rows = db.session.execute(
+        db.select(totals.c.player_id, totals.c.opponent_id, *_totals_columns(totals))
+    ).all()
+    records = {(player_id, opponent_id): HeadToHeadRecord(*values) for player_id, opponent_id, *values in rows}
+    
+    player_ids = {player_id for player_id, _ in records}
+    players = db.session.scalars(
+        db.select(Player).where(Player.id.in_(player_ids)).order_by(Player.name)
+    ).all() if player_ids else []
+    return HeadToHead([freeze_player(player) for player in players], records)
+
+def get_head_to_head(season_id=None, week_from=None, week_to=None):
+    """Matrice des confrontations, servie depuis le cache tant que les scores ne changent pas"""
+    return standings_cache.get_or_compute(
+        lambda: compute_head_to_head(season_id, week_from, week_to),
+        'h2h', season_id, week_from, week_to)
 
 def update_weekly_standings(season_id, week_number):
     """Met à jour les statistiques hebdomadaires en base"""
@@ -649,10 +2447,1407 @@ def update_weekly_standings(season_id, week_number):
     
     db.session.commit()
 
+STANDINGS_FIELDS = ('matches_played', 'wins', 'draws', 'losses', 'goals_for', 'goals_against', 'points')
+
+def _standing_dict(player, row):
+    """Convertit une ligne de classement stockée au format utilisé par les templates"""
+    stats = {field: (getattr(row, field) or 0) if row else 0 for field in STANDINGS_FIELDS}
+    matches_played = stats['matches_played']
+    goal_average = stats['goals_for'] / matches_played if matches_played > 0 else 0
+    stats.update(
+        player=player,
+        goal_difference=stats['goals_for'] - stats['goals_against'],
+        goal_average=round(goal_average, 2)
+    )
+    return stats
+
+def _load_standings(model, season_id, division_id, head_to_head, *conditions):
+    rows = db.session.execute(
+        db.select(Player, model)
+        .outerjoin(model, and_(model.player_id == Player.id, model.season_id == season_id, *conditions))
+        .where(Player.is_active.is_(True), *_division_filter(division_id))
+    ).all()
+    
+    standings = [_standing_dict(player, row) for player, row in rows]
+    return rank_standings(standings, head_to_head=head_to_head)
+
+@timed
+def load_weekly_standings(season_id, week_number, division_id=None):
+    """Lit le classement hebdomadaire matérialisé"""
+    return _load_standings(WeeklyStandings, season_id, division_id,
+                           lambda: get_head_to_head(season_id, week_number, week_number),
+                           WeeklyStandings.week_number == week_number)
+
+@timed
+def load_cumulative_standings(season_id, division_id=None):
+    """Lit le classement cumulé matérialisé"""
+    return _load_standings(SeasonStandings, season_id, division_id,
+                           lambda: get_head_to_head(season_id))
+
+SeasonTotals = namedtuple('SeasonTotals', 'weeks_played matches_played matches_total total_goals')
+
+def season_totals_by_id(season_ids):
+    """Agrégats de plusieurs saisons (matchs joués, buts...) en une seule requête groupée"""
+    if not season_ids:
+        return {}
+    completed = Match.is_completed.is_(True)
+    rows = db.session.execute(
+        db.select(
+            Match.season_id,
+            func.max(case((completed, Match.week_number))),
+            func.count(case((completed, Match.id))),
+            func.count(Match.id),
+            func.sum(case((completed, Match.player1_score + Match.player2_score), else_=0)),
+        )
+        .where(Match.season_id.in_(season_ids), Match.tournament_id.is_(None))
+        .group_by(Match.season_id)
+    ).all()
+    totals = {season_id: SeasonTotals(0, 0, 0, 0) for season_id in season_ids}
+    totals.update((season_id, SeasonTotals(*(value or 0 for value in values))) for season_id, *values in rows)
+    return totals
+
+def season_totals(season_id):
+    """Agrégats d'une saison (matchs joués, buts...)"""
+    return season_totals_by_id([season_id])[season_id]
+
+SeasonCounts = namedtuple('SeasonCounts', 'total finished active weeks_played')
+
+def season_counts():
+    """Compteurs globaux de l'historique, sans charger les saisons"""
+    total, active, weeks = db.session.execute(
+        db.select(func.count(Season.id),
+                  func.count(case((Season.is_active.is_(True), Season.id))),
+                  func.sum(Season.current_week))
+    ).one()
+    return SeasonCounts(total, total - active, active, max((weeks or 0) - total, 0))
+
+def season_cursor(season):
+    """Curseur de pagination pointant juste après cette saison"""
+    return f'{season.start_date.isoformat()}_{season.id}'
+
+def parse_season_cursor(value):
+    """(start_date, id) d'un curseur d'historique, None pour la première page"""
+    if not value:
+        return None
+    start_date, season_id = value.rsplit('_', 1)
+    return datetime.fromisoformat(start_date), int(season_id)
+
+def _season_division_id(season_id):
+    """Division dans laquelle un joueur a disputé la saison (celle de ses matchs)"""
+    return (
+        db.select(func.max(Match.division_id))
+        .where(Match.season_id == season_id, Match.tournament_id.is_(None),
+               (Match.player1_id == Player.id) | (Match.player2_id == Player.id))
+        .correlate(Player)
+        .scalar_subquery()
+    )
+
+def _best(standings, field, lowest=False):
+    """Meilleur joueur sur un critère, le mieux classé l'emportant en cas d'égalité"""
+    if not standings:
+        return None
+    pick = min if lowest else max
+    best = pick(standings, key=lambda entry: entry[field])
+    return {'player': best['player'], field: best[field]}
+
+@timed
+def freeze_season(season, moves=()):
+    """Écrit le bilan figé d'une saison : classements finaux, récompenses et agrégats
+    
+    Les classements sont recalculés depuis les matchs, pas lus dans les classements
+    matérialisés : une ancienne saison sans lignes stockées a quand même son bilan.
+    Les divisions sont celles des matchs de la saison, pas celles des joueurs : le bilan
+    reste juste même écrit après les promotions et relégations. Rien n'est commité ici ;
+    un bilan existant n'est jamais réécrit, d'où le refus (ValueError) d'un bilan vide
+    pour une saison qui a des matchs joués.
+    """
+    existing = db.session.scalar(db.select(SeasonSnapshot).where(SeasonSnapshot.season_id == season.id))
+    if existing:
+        return existing
+    
+    totals = _side_totals(_match_sides(season.id))
+    division_id = func.coalesce(_season_division_id(season.id), Player.division_id)
+    rows = db.session.execute(
+        db.select(Player, *_totals_columns(totals), Division)
+        .join(totals, totals.c.player_id == Player.id)
+        .outerjoin(Division, Division.id == division_id)
+    ).all()
+    
+    season_summary = season_totals(season.id)
+    if season_summary.matches_played > 0 and not rows:
+        raise ValueError(f'{season.name} : {season_summary.matches_played} match(s) joué(s) '
+                         f'mais aucun classement, bilan non figé')
+    
+    by_division = {}
+    for player, *columns, division in rows:
+        key = (division.level, division.name) if division else (None, None)
+        by_division.setdefault(key, []).append(_standing_entry(player, *columns))
+    
+    divisions = []
+    for (level, name), standings in sorted(by_division.items(), key=lambda item: item[0][0] or 0):
+        rank_standings(standings, head_to_head=lambda: get_head_to_head(season.id))
+        for entry in standings:
+            entry.update(player=entry['player'].name, player_id=entry['player'].id)
+        divisions.append({'name': name, 'level': level, 'standings': standings})
+    
+    # Récompenses sur l'ensemble des joueurs, dans l'ordre des classements
+    everyone = [entry for division in divisions for entry in division['standings']]
+    awards = {
+        'champions': [{'division': division['name'], 'player': division['standings'][0]['player'],
+                       'points': division['standings'][0]['points']} for division in divisions],
+        'best_attack': _best(everyone, 'goals_for'),
+        'best_defense': _best(everyone, 'goals_against', lowest=True),
+        'best_average': _best(everyone, 'goal_average'),
+        'most_wins': _best(everyone, 'wins'),
+    }
+    data = {
+        'divisions': divisions,
+        'awards': awards,
+        'moves': [{'player': player.name, 'from': old.name, 'to': new.name} for player, old, new in moves],
+    }
+    
+    snapshot = SeasonSnapshot(
+        season_id=season.id,
+        champion_name=awards['champions'][0]['player'] if awards['champions'] else None,
+        data=json.dumps(data, ensure_ascii=False, separators=(',', ':')),
+        **season_summary._asdict()
+    )
+    db.session.add(snapshot)
+    return snapshot
+
+def apply_promotion_relegation(season_id):
+    """Promotions et relégations entre divisions voisines d'après le classement final
+    
+    Les classements de toutes les divisions sont lus en une seule requête.
+    Retourne la liste des mouvements (joueur, ancienne division, nouvelle division).
+    """
+    divisions = get_divisions()
+    if len(divisions) < 2:
+        return []
+    
+    by_division = group_by_division(load_cumulative_standings(season_id))
+    spots = app.config['PROMOTION_SPOTS']
+    
+    moves = []
+    for upper, lower in zip(divisions, divisions[1:]):
+        upper_standings = by_division.get(upper.id, [])
+        lower_standings = by_division.get(lower.id, [])
+        # Jamais plus de la moitié d'une division, pour qu'un joueur ne monte et ne descende pas à la fois
+        count = min(spots, len(upper_standings) // 2, len(lower_standings) // 2)
+        if count == 0:
+            continue
+        for standing in upper_standings[-count:]:
+            moves.append((standing['player'], upper, lower))
+        for standing in lower_standings[:count]:
+            moves.append((standing['player'], lower, upper))
+    
+    for player, _, new_division in moves:
+        player.division = new_division
+    return moves
+
+def _add_match_deltas(deltas, match, sign):
+    """Ajoute (sign=1) ou retire (sign=-1) le résultat d'un match aux deltas de classement
+    
+    Les clés sont (saison, semaine, joueur) pour les lignes hebdomadaires et
+    (saison, None, joueur) pour les lignes de saison.
+    """
+    sides = (
+        (match.player1_id, match.player1_score, match.player2_score),
+        (match.player2_id, match.player2_score, match.player1_score),
+    )
+    for player_id, goals_for, goals_against in sides:
+        if goals_for > goals_against:
+            result = 'wins'
+        elif goals_for == goals_against:
+            result = 'draws'
+        else:
+            result = 'losses'
+        
+        for key in ((match.season_id, match.week_number, player_id), (match.season_id, None, player_id)):
+            delta = deltas[key]
+            delta['matches_played'] += sign
+            delta['goals_for'] += sign * goals_for
+            delta['goals_against'] += sign * goals_against
+            delta[result] += sign
+
+def _apply_standings_deltas(deltas):
+    """Applique les deltas aux classements stockés, en deux requêtes quel que soit le nombre de matchs"""
+    if not deltas:
+        return
+    
+    season_ids = {season_id for season_id, _, _ in deltas}
+    week_numbers = {week_number for _, week_number, _ in deltas if week_number is not None}
+    player_ids = {player_id for _, _, player_id in deltas}
+    
+    rows = {}
+    if week_numbers:
+        for row in WeeklyStandings.query.filter(
+            WeeklyStandings.season_id.in_(season_ids),
+            WeeklyStandings.week_number.in_(week_numbers),
+            WeeklyStandings.player_id.in_(player_ids)
+        ):
+            rows[(row.season_id, row.week_number, row.player_id)] = row
+    for row in SeasonStandings.query.filter(
+        SeasonStandings.season_id.in_(season_ids),
+        SeasonStandings.player_id.in_(player_ids)
+    ):
+        rows[(row.season_id, None, row.player_id)] = row
+    
+    for key, delta in deltas.items():
+        season_id, week_number, player_id = key
+        standing = rows.get(key)
+        if standing is None:
+            if week_number is None:
+                standing = SeasonStandings(season_id=season_id, player_id=player_id,
+                                           **dict.fromkeys(STANDINGS_FIELDS, 0))
+            else:
+                standing = WeeklyStandings(season_id=season_id, player_id=player_id, week_number=week_number,
+                                           **dict.fromkeys(STANDINGS_FIELDS, 0))
+            db.session.add(standing)
+        
+        for field, value in delta.items():
+            setattr(standing, field, getattr(standing, field) + value)
+        standing.calculate_stats()
+
+@timed
+def record_match_scores(results):
+    """Enregistre ou corrige plusieurs scores et met à jour les classements en un seul passage
+    
+    results est une liste de (match, score1, score2). Seules les lignes de
+    classement des joueurs concernés sont modifiées ; rien n'est commité ici.
+    """
+    deltas = defaultdict(lambda: defaultdict(int))
+    newly_rated = []
+    corrected = False
+    for match, score1, score2 in results:
+        # Les matchs de tournoi ne comptent pas au classement du championnat
+        league = match.tournament_id is None
+        if match.is_completed and league:
+            # Correction : retirer l'ancien résultat avant d'appliquer le nouveau
+            _add_match_deltas(deltas, match, -1)
+        if match.rating_seq is None:
+            newly_rated.append(match)
+        else:
+            corrected = True
+        
+        match.player1_score = score1
+        match.player2_score = score2
+        match.is_completed = True
+        if score1 > score2:
+            match.winner_id = match.player1_id
+        elif score2 > score1:
+            match.winner_id = match.player2_id
+        else:
+            match.winner_id = None  # Match nul
+        if league:
+            _add_match_deltas(deltas, match, 1)
+    
+    _apply_standings_deltas(deltas)
+    rate_matches(newly_rated)
+    if corrected:
+        # Une correction change toutes les notes qui suivent : rejeu complet
+        db.session.flush()
+        replay_ratings(db.session.connection())
+        for instance in list(db.session.identity_map.values()):
+            if isinstance(instance, Player):
+                db.session.expire(instance, ['rating'])
+            elif isinstance(instance, Match):
+                db.session.expire(instance, ['rating_seq', 'player1_elo', 'player2_elo', 'elo_delta'])
+
+def record_match_score(match, score1, score2):
+    """Enregistre ou corrige un score en mettant à jour les classements par delta"""
+    record_match_scores([(match, score1, score2)])
+
+def elo_delta(rating1, rating2, score1, score2):
+    """Points Elo gagnés par le joueur 1 (perdus par le joueur 2) ; accepte aussi des tableaux NumPy"""
+    expected = 1 / (1 + 10 ** ((rating2 - rating1) / 400))
+    result = ((score1 > score2) * 1 + (score1 >= score2) * 1) / 2  # 1, 0.5 ou 0
+    return app.config['ELO_K'] * (result - expected)
+
+def rate_matches(matches):
+    """Met à jour les notes Elo avec des matchs tout juste terminés, dans l'ordre donné"""
+    if not matches:
+        return
+    next_seq = (db.session.scalar(db.select(func.max(Match.rating_seq))) or 0) + 1
+    for match in matches:
+        player1, player2 = match.player1, match.player2
+        delta = elo_delta(player1.rating, player2.rating, match.player1_score, match.player2_score)
+        match.player1_elo = player1.rating
+        match.player2_elo = player2.rating
+        match.elo_delta = delta
+        match.rating_seq = next_seq
+        next_seq += 1
+        player1.rating += delta
+        player2.rating -= delta
+
+# En dessous, les tranches sans joueur répété sont trop courtes pour que NumPy soit rentable
+ELO_VECTOR_MIN_PLAYERS = 64
+
+def _independent_runs(player1_idx, player2_idx, player_count):
+    """Découpe la suite des matchs en tranches [début, fin) où aucun joueur n'apparaît deux fois"""
+    count = len(player1_idx)
+    # Pour chaque match, le dernier match précédent de l'un de ses deux joueurs (-1 si aucun)
+    players = np.concatenate([player1_idx, player2_idx])
+    positions = np.concatenate([np.arange(count), np.arange(count)])
+    order = np.lexsort((positions, players))
+    same_player = np.concatenate([[False], players[order][1:] == players[order][:-1]])
+    previous_side = np.empty(2 * count, dtype=np.int64)
+    previous_side[order] = np.where(same_player, np.concatenate([[-1], positions[order][:-1]]), -1)
+    previous = np.maximum(previous_side[:count], previous_side[count:])
+    
+    # Une tranche compte au plus player_count // 2 matchs
+    longest = max(player_count // 2, 1)
+    start = 0
+    while start < count:
+        window = previous[start + 1:start + longest]
+        conflicts = np.flatnonzero(window >= start)
+        end = start + 1 + (conflicts[0] if len(conflicts) else len(window))
+        yield start, end
+        start = end
+
+@timed
+def replay_ratings(connection):
+    """Recalcule toutes les notes Elo depuis le premier match de l'historique
+    
+    Les matchs sont rejoués dans l'ordre où ils ont été notés, puis les matchs terminés
+    jamais notés dans l'ordre du calendrier. Chaque tranche sans joueur répété est
+    calculée d'un coup sur des tableaux NumPy : le résultat est celui d'un rejeu match
+    par match. Avec peu de joueurs les tranches sont trop courtes et le rejeu se fait
+    match par match. Prend une connexion pour servir aussi d'étape de migration.
+    """
+    match, player = Match.__table__, Player.__table__
+    rows = connection.execute(
+        db.select(match.c.id, match.c.player1_id, match.c.player2_id,
+                  match.c.player1_score, match.c.player2_score)
+        .where(match.c.is_completed.is_(True))
+        .order_by(case((match.c.rating_seq.is_(None), 1), else_=0), match.c.rating_seq,
+                  match.c.season_id, match.c.week_number, match.c.match_number, match.c.id)
+    ).all()
+    player_ids = np.array(connection.execute(db.select(player.c.id).order_by(player.c.id)).scalars().all(),
+                          dtype=np.int64)
+    ratings = np.full(len(player_ids), app.config['ELO_INITIAL'])
+    
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 5)
+    match_ids = columns[:, 0]
+    player1_idx = np.searchsorted(player_ids, columns[:, 1])
+    player2_idx = np.searchsorted(player_ids, columns[:, 2])
+    before1 = np.empty(len(rows))
+    before2 = np.empty(len(rows))
+    deltas = np.empty(len(rows))
+    if len(player_ids) >= ELO_VECTOR_MIN_PLAYERS:
+        for start, end in _independent_runs(player1_idx, player2_idx, len(player_ids)):
+            first, second = player1_idx[start:end], player2_idx[start:end]
+            before1[start:end] = ratings[first]
+            before2[start:end] = ratings[second]
+            deltas[start:end] = elo_delta(before1[start:end], before2[start:end],
+                                          columns[start:end, 3], columns[start:end, 4])
+            ratings[first] += deltas[start:end]
+            ratings[second] -= deltas[start:end]
+    else:
+        values = ratings.tolist()
+        for i, (first, second, score1, score2) in enumerate(zip(
+                player1_idx.tolist(), player2_idx.tolist(), columns[:, 3].tolist(), columns[:, 4].tolist())):
+            delta = elo_delta(values[first], values[second], score1, score2)
+            before1[i], before2[i], deltas[i] = values[first], values[second], delta
+            values[first] += delta
+            values[second] -= delta
+        ratings = np.array(values)
+    
+    if rows:
+        # updated_date gardée telle quelle (sinon onupdate la met à maintenant) : les notes
+        # ne sont pas une modification du match pour les exports incrémentaux
+        connection.execute(
+            match.update().where(match.c.id == db.bindparam('match_id')).values(
+                rating_seq=db.bindparam('seq'), player1_elo=db.bindparam('before1'),
+                player2_elo=db.bindparam('before2'), elo_delta=db.bindparam('delta'),
+                updated_date=match.c.updated_date),
+            [{'match_id': match_id, 'seq': seq, 'before1': b1, 'before2': b2, 'delta': delta}
+             for seq, (match_id, b1, b2, delta) in enumerate(
+                 zip(match_ids.tolist(), before1.tolist(), before2.tolist(), deltas.tolist()), 1)]
+        )
+    if len(player_ids):
+        connection.execute(
+            player.update().where(player.c.id == db.bindparam('player_id')).values(rating=db.bindparam('value')),
+            [{'player_id': player_id, 'value': value}
+             for player_id, value in zip(player_ids.tolist(), ratings.tolist())]
+        )
+    return len(rows)
+
+def rating_history(player_id):
+    """Évolution Elo d'un joueur, match par match, lue par les index (joueur, rating_seq)"""
+    home = db.select(
+        Match.id.label('match_id'), Match.season_id, Match.week_number, Match.rating_seq,
+        Match.player2_id.label('opponent_id'), Match.player1_elo.label('rating_before'),
+        Match.elo_delta.label('delta')
+    ).where(Match.player1_id == player_id, Match.rating_seq.isnot(None))
+    away = db.select(
+        Match.id.label('match_id'), Match.season_id, Match.week_number, Match.rating_seq,
+        Match.player1_id.label('opponent_id'), Match.player2_elo.label('rating_before'),
+        (-Match.elo_delta).label('delta')
+    ).where(Match.player2_id == player_id, Match.rating_seq.isnot(None))
+    rows = db.session.execute(union_all(home, away).order_by('rating_seq')).all()
+    return [dict(row._asdict(), rating_after=row.rating_before + row.delta) for row in rows]
+
+# Probabilités de classement final : probabilities[i][k] = chance que players[i] finisse (k+1)e ;
+# version des données simulées, stale si des scores sont arrivés depuis
+SeasonOdds = namedtuple('SeasonOdds', 'players probabilities runs remaining version stale', defaults=(0, False))
+
+# Matchs de « rodage » ajoutés aux stats de chaque joueur, au niveau moyen de la ligue
+SIMULATION_PRIOR_MATCHES = 5
+# Buts simulés par joueur et par match : 0 à 10, la probabilité au-delà étant négligeable
+SIMULATION_MAX_GOALS = 10
+
+def _score_distribution(home_rate, away_rate):
+    """Tables d'alias (Walker) des scores exacts de chaque match (lois de Poisson indépendantes)
+    
+    Un tirage coûte alors une case prise au hasard et une comparaison, quelle que soit la
+    taille de la table, au lieu d'une recherche dichotomique dans la fonction de répartition.
+    Construction vectorisée : aucune boucle Python par match.
+    """
+    goals = np.arange(SIMULATION_MAX_GOALS + 1)
+    factorials = np.cumprod(np.concatenate([[1.0], goals[1:]]))
+    def poisson(rate):
+        return np.exp(-rate)[:, None] * rate[:, None] ** goals / factorials
+    joint = (poisson(home_rate)[:, :, None] * poisson(away_rate)[:, None, :]).reshape(len(home_rate), -1)
+    joint /= joint.sum(axis=1, keepdims=True)
+    
+    # Méthode de Vose menée sur tous les matchs à la fois : à chaque tour, chaque match
+    # complète une case trop petite avec une case trop grande, soit au plus size - 1 tours
+    size = joint.shape[1]
+    weights = joint * size
+    threshold = np.ones(joint.shape)
+    alias = np.tile(np.arange(size, dtype=np.int16), (len(joint), 1))
+    done = np.zeros(joint.shape, dtype=bool)
+    for _ in range(size - 1):
+        small = (weights < 1) & ~done
+        large = (weights >= 1) & ~done
+        matches = np.flatnonzero(small.any(axis=1) & large.any(axis=1))
+        if not len(matches):
+            break
+        short, tall = small[matches].argmax(axis=1), large[matches].argmax(axis=1)
+        threshold[matches, short] = weights[matches, short]
+        alias[matches, short] = tall
+        weights[matches, tall] -= 1 - weights[matches, short]
+        done[matches, short] = True
+    return threshold.astype(np.float32), alias
+
+def _simulate_chunk(chunk):
+    """Simule un lot de fins de saison et compte les places obtenues par chaque joueur
+    
+    Fonction pure sur des tableaux NumPy, pour pouvoir tourner dans un autre processus.
+    Chaque match reçoit un score exact tiré dans sa table d'alias.
+    Retourne une matrice (joueur, place) d'occurrences.
+    """
+    runs, seed, points, goals_for, goals_against, played, home, away, threshold, alias = chunk
+    rng = np.random.default_rng(seed)
+    player_count = len(points)
+    match_count = len(home)
+    
+    rows = np.arange(match_count)[:, None]
+    cells = rng.integers(0, threshold.shape[1], size=(match_count, runs), dtype=np.int16)
+    kept = rng.random((match_count, runs), dtype=np.float32) < threshold[rows, cells]
+    scores = np.where(kept, cells, alias[rows, cells])
+    
+    # Score exact -> buts et points de chaque côté
+    side = SIMULATION_MAX_GOALS + 1
+    home_goals_of = np.repeat(np.arange(side), side).astype(np.float32)
+    away_goals_of = np.tile(np.arange(side), side).astype(np.float32)
+    home_points_of = 3 * (home_goals_of > away_goals_of) + (home_goals_of == away_goals_of)
+    away_points_of = 3 * (away_goals_of > home_goals_of) + (home_goals_of == away_goals_of)
+    home_goals, away_goals = home_goals_of[scores], away_goals_of[scores]
+    
+    # Matrices d'incidence joueur -> match : les cumuls deviennent des produits matriciels
+    home_of = np.zeros((player_count, match_count), dtype=np.float32)
+    home_of[home, np.arange(match_count)] = 1
+    away_of = np.zeros((player_count, match_count), dtype=np.float32)
+    away_of[away, np.arange(match_count)] = 1
+    total_points = points[:, None] + home_of @ home_points_of[scores] + away_of @ away_points_of[scores]
+    total_for = goals_for[:, None] + home_of @ home_goals + away_of @ away_goals
+    total_against = goals_against[:, None] + home_of @ away_goals + away_of @ home_goals
+    average = np.round(total_for / np.maximum(played, 1)[:, None], 2)
+    
+    # Même ordre que les classements (points, moyenne, différence), puis au hasard
+    order = np.lexsort((rng.random((player_count, runs)), total_for - total_against, average, total_points),
+                       axis=0)[::-1]
+    places = np.broadcast_to(np.arange(player_count)[:, None], order.shape)
+    return np.bincount((order * player_count + places).ravel(),
+                       minlength=player_count * player_count).reshape(player_count, player_count)
+
+_simulation_pool = None
+
+def _simulation_executor():
+    global _simulation_pool
+    if _simulation_pool is None:
+        _simulation_pool = ProcessPoolExecutor(app.config['SIMULATION_WORKERS'])
+    return _simulation_pool
+
+@timed
+def simulate_season(season_id, division_id=None, runs=None, seed=None):
+    """Probabilités de classement final par simulation Monte Carlo des matchs restants
+    
+    Les buts de chaque match suivent une loi de Poisson dont l'espérance combine l'attaque
+    du joueur et la défense de l'adversaire sur tout l'historique du championnat, ramenées
+    vers la moyenne de la ligue. Le départage par confrontations directes n'est pas simulé.
+    """
+    runs = runs or app.config['SIMULATION_RUNS']
+    standings = load_cumulative_standings(season_id, division_id)
+    players = [standing['player'] for standing in standings]
+    index = {player.id: i for i, player in enumerate(players)}
+    
+    remaining = db.session.execute(
+        db.select(Match.player1_id, Match.player2_id)
+        .where(Match.season_id == season_id, Match.tournament_id.is_(None), Match.is_completed.is_(False),
+               Match.player1_id.in_(index), Match.player2_id.in_(index))
+    ).all()
+    if not remaining:
+        return None
+    
+    totals = _side_totals(_sides(Match.tournament_id.is_(None)))
+    history = {row.player_id: row for row in db.session.execute(
+        db.select(totals).where(totals.c.player_id.in_(index)))}
+    scored = sum(row.goals_for for row in history.values())
+    league_average = scored / max(sum(row.matches_played for row in history.values()), 1) or 1.0
+    
+    def rate(player, field):
+        row = history.get(player.id)
+        goals, matches = (getattr(row, field), row.matches_played) if row else (0, 0)
+        return (goals + SIMULATION_PRIOR_MATCHES * league_average) / (matches + SIMULATION_PRIOR_MATCHES)
+    
+    attack = np.array([rate(player, 'goals_for') for player in players]) / league_average
+    defense = np.array([rate(player, 'goals_against') for player in players]) / league_average
+    home = np.array([index[player1_id] for player1_id, _ in remaining])
+    away = np.array([index[player2_id] for _, player2_id in remaining])
+    
+    base = [np.array([standing[field] for standing in standings], dtype=float)
+            for field in ('points', 'goals_for', 'goals_against')]
+    played = np.array([standing['matches_played'] for standing in standings], dtype=float)
+    played += np.bincount(home, minlength=len(players)) + np.bincount(away, minlength=len(players))
+    tables = _score_distribution(league_average * attack[home] * defense[away],
+                              league_average * attack[away] * defense[home])
+    
+    # Lots bornés en cases : des tableaux matchs x tirages de taille fixe quel que soit le calendrier
+    chunk_size = max(1, min(app.config['SIMULATION_CHUNK_SIZE'],
+                            app.config['SIMULATION_MAX_CELLS'] // len(remaining)))
+    sizes = [min(chunk_size, runs - start) for start in range(0, runs, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    chunks = [(size, chunk_seed, *base, played, home, away, *tables)
+              for size, chunk_seed in zip(sizes, seeds)]
+    if app.config['SIMULATION_WORKERS'] > 0 and len(chunks) > 1:
+        counts = sum(_simulation_executor().map(_simulate_chunk, chunks))
+    else:
+        counts = sum(map(_simulate_chunk, chunks))
+    
+    return SeasonOdds([freeze_player(player) for player in players], (counts / runs).tolist(),
+                      runs, len(remaining))
+
+def refresh_season_odds(season_id, division_id=None):
+    """Simule et enregistre les probabilités si personne ne l'a fait pour la version courante
+    
+    La réservation passe par un UPDATE conditionnel sous le verrou d'écriture : une seule
+    simulation par version des données, tous workers confondus. Retourne True si ce thread
+    a fait le calcul.
+    """
+    scope = {'season_id': season_id, 'division_id': division_id or 0}
+    version = standings_cache.version()
+    with write_lock():
+        if db.session.scalar(db.select(SeasonOddsResult.id).filter_by(**scope)) is None:
+            db.session.add(SeasonOddsResult(**scope))
+            db.session.flush()
+        claimed = db.session.execute(
+            db.update(SeasonOddsResult).filter_by(**scope)
+            .where(SeasonOddsResult.claimed_version < version).values(claimed_version=version)
+        ).rowcount
+        db.session.commit()
+    if not claimed:
+        return False
+    
+    odds = simulate_season(season_id, division_id)
+    with write_lock():
+        db.session.execute(
+            db.update(SeasonOddsResult).filter_by(**scope).where(SeasonOddsResult.version < version)
+            .values(version=version, computed_date=datetime.utcnow(),
+                    data=json.dumps(dict(zip(('players', 'probabilities', 'runs', 'remaining'), odds)),
+                                    separators=(',', ':')) if odds else None)
+        )
+        db.session.commit()
+    # Nouvel ETag pour les pages qui montrent les probabilités
+    standings_cache.invalidate(StandingsCache.ODDS_VERSION_NAME)
+    return True
+
+class OddsRefresher:
+    """Relance les simulations en arrière-plan, hors du chemin des requêtes
+    
+    Un thread par worker, démarré à la première demande (après le fork de gunicorn), traite
+    les demandes une à une, après un délai qui regroupe les scores saisis à la suite. Chaque
+    (saison, division) n'est demandée qu'une fois par version des données et par worker ;
+    refresh_season_odds départage ensuite les workers.
+    """
+    
+    def __init__(self, delay):
+        self.delay = delay
+        # (saison, division) -> version des données demandée, puis dernière version traitée
+        self.pending = {}
+        self.handled = {}
+        self.busy = False
+        self.condition = threading.Condition()
+        self.thread = None
+    
+    def request(self, season_id, division_id, version):
+        key = (season_id, division_id)
+        with self.condition:
+            if max(self.handled.get(key, 0), self.pending.get(key, 0)) >= version:
+                return
+            self.pending[key] = version
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name='odds-refresher', daemon=True)
+                self.thread.start()
+            self.condition.notify_all()
+    
+    def wait(self, timeout=None):
+        """Attend la fin des simulations demandées ; False si timeout est dépassé"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.busy, timeout)
+    
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending)
+            time.sleep(self.delay)
+            with self.condition:
+                key, version = self.pending.popitem()
+                self.busy = True
+            try:
+                with app.app_context():
+                    refresh_season_odds(*key)
+            except Exception:
+                app.logger.exception('🎲 Simulation des fins de saison impossible')
+            # Même en cas d'échec : la prochaine écriture relancera la simulation
+            with self.condition:
+                self.handled[key] = max(self.handled.get(key, 0), version)
+                self.busy = False
+                self.condition.notify_all()
+
+odds_refresher = OddsRefresher(app.config['SIMULATION_DELAY'])
+
+def _load_season_odds(season_id, division_id):
+    row = db.session.execute(
+        db.select(SeasonOddsResult.version, SeasonOddsResult.data)
+        .filter_by(season_id=season_id, division_id=division_id or 0)
+    ).first()
+    if row is None or row.data is None:
+        return (row.version if row else 0), None
+    data = json.loads(row.data)
+    return row.version, SeasonOdds([PlayerSnapshot(*player) for player in data['players']],
+                                   data['probabilities'], data['runs'], data['remaining'], row.version)
+
+def get_season_odds(season_id, division_id=None):
+    """Dernières probabilités enregistrées : la page ne lance jamais la simulation elle-même
+    
+    Si elles datent d'avant la dernière écriture, le recalcul part en arrière-plan et la
+    page montre en attendant les précédentes, marquées stale. None si rien n'est calculé.
+    """
+    version = standings_cache.version()
+    simulated_version, odds = standings_cache.get_or_compute(
+        lambda: _load_season_odds(season_id, division_id), 'odds', season_id, division_id,
+        standings_cache.version(StandingsCache.ODDS_VERSION_NAME))
+    if simulated_version < version:
+        odds_refresher.request(season_id, division_id, version)
+    if odds is None:
+        return None
+    return odds._replace(stale=simulated_version < version)
+
+def rebuild_standings(season_id):
+    """Reconstruit entièrement les classements stockés d'une saison à partir des matchs"""
+    WeeklyStandings.query.filter_by(season_id=season_id).delete()
+    SeasonStandings.query.filter_by(season_id=season_id).delete()
+    
+    weeks = db.session.scalars(
+        db.select(Match.week_number).where(Match.season_id == season_id, Match.tournament_id.is_(None))
+        .distinct()
+    ).all()
+    for week_number in weeks:
+        update_weekly_standings(season_id, week_number)
+    
+    for stats in calculate_cumulative_standings(season_id):
+        standing = SeasonStandings(season_id=season_id, player_id=stats['player'].id)
+        for field in STANDINGS_FIELDS:
+            setattr(standing, field, stats[field])
+        standing.calculate_stats()
+        db.session.add(standing)
+    
+    db.session.commit()
+
+def rebuild_all_standings(connection):
+    """Reconstruit les classements stockés de toutes les saisons à partir des matchs
+    
+    Deux INSERT ... SELECT agrégés, sans passer par l'ORM : sert d'étape de migration aux
+    bases créées avant les classements matérialisés, dont les tables étaient vides.
+    Comme les deltas, seuls les joueurs qui ont joué ont une ligne, actifs ou non.
+    """
+    match = Match.__table__
+    sides = union_all(*(
+        db.select(match.c.season_id, match.c.week_number, player_id.label('player_id'),
+                  goals_for.label('goals_for'), goals_against.label('goals_against'))
+        .where(match.c.is_completed.is_(True), match.c.tournament_id.is_(None))
+        for player_id, goals_for, goals_against in (
+            (match.c.player1_id, match.c.player1_score, match.c.player2_score),
+            (match.c.player2_id, match.c.player2_score, match.c.player1_score),
+        )
+    )).subquery('sides')
+    
+    matches_played = func.count()
+    wins = func.sum(case((sides.c.goals_for > sides.c.goals_against, 1), else_=0))
+    draws = func.sum(case((sides.c.goals_for == sides.c.goals_against, 1), else_=0))
+    losses = func.sum(case((sides.c.goals_for < sides.c.goals_against, 1), else_=0))
+    goals_for = func.sum(sides.c.goals_for)
+    goals_against = func.sum(sides.c.goals_against)
+    for model, keys in ((WeeklyStandings, ('season_id', 'week_number', 'player_id')),
+                        (SeasonStandings, ('season_id', 'player_id'))):
+        group = [sides.c[key] for key in keys]
+        totals = db.select(*group, matches_played, wins, draws, losses, goals_for, goals_against,
+                           wins * 3 + draws, goals_for * 1.0 / matches_played).group_by(*group)
+        connection.execute(db.delete(model.__table__))
+        connection.execute(db.insert(model.__table__).from_select(
+            [*keys, *STANDINGS_FIELDS, 'goal_average'], totals))
+
+def check_standings(season_id):
+    """Compare les classements stockés à un recalcul complet, retourne les écarts"""
+    differences = []
+    
+    def compare(label, expected, stored):
+        for exp, got in zip(expected, stored):
+            for field in STANDINGS_FIELDS:
+                if exp[field] != got[field]:
+                    differences.append((label, exp['player'].name, field, exp[field], got[field]))
+    
+    stored = {s['player'].id: s for s in load_cumulative_standings(season_id)}
+    expected = calculate_cumulative_standings(season_id)
+    compare('saison', expected, [stored[s['player'].id] for s in expected])
+    
+    weeks = db.session.scalars(
+        db.select(Match.week_number).where(Match.season_id == season_id, Match.tournament_id.is_(None))
+        .distinct()
+    ).all()
+    for week_number in sorted(weeks):
+        stored = {s['player'].id: s for s in load_weekly_standings(season_id, week_number)}
+        expected = calculate_weekly_standings(season_id, week_number)
+        compare(f'semaine {week_number}', expected, [stored[s['player'].id] for s in expected])
+    
+    return differences
+
+def _tournament_entries(tournament_id, *filters):
+    """Participants d'un tournoi et leurs totaux sur les matchs filtrés, en une requête agrégée"""
+    totals = _side_totals(_sides(Match.tournament_id == tournament_id, *filters))
+    rows = db.session.execute(
+        db.select(TournamentPlayer, Player, *_totals_columns(totals))
+        .join(Player, Player.id == TournamentPlayer.player_id)
+        .outerjoin(totals, totals.c.player_id == TournamentPlayer.player_id)
+        .where(TournamentPlayer.tournament_id == tournament_id)
+    ).all()
+    
+    entries = []
+    for entry, player, *counts in rows:
+        stats = _standing_entry(player, *counts)
+        stats.update(entry=entry, user=player, is_eliminated=entry.is_eliminated,
+                     elimination_round=entry.elimination_round)
+        entries.append(stats)
+    return entries
+
+def calculate_tournament_standings(tournament_id):
+    """Classement d'un tournoi : joueurs en lice d'abord, puis éliminés du plus tardif au plus précoce"""
+    standings = _tournament_entries(tournament_id)
+    standings.sort(key=lambda x: (not x['is_eliminated'], x['elimination_round'] or 0,
+                                  x['points'], x['goal_difference'], x['goals_for']), reverse=True)
+    return standings
+
+def _round_key(stats):
+    return (stats['wins'], stats['goal_difference'], stats['goals_for'])
+
+def select_eliminated(contenders):
+    """Joueurs éliminés à l'issue d'une journée : ceux qui ont le moins de victoires
+    
+    La différence de buts puis les buts marqués départagent quand l'élimination
+    laisserait moins de deux joueurs. Une égalité parfaite n'élimine personne.
+    """
+    for depth in range(1, 4):
+        worst = min(_round_key(s)[:depth] for s in contenders)
+        eliminated = [s for s in contenders if _round_key(s)[:depth] == worst]
+        if len(contenders) - len(eliminated) >= 2:
+            return eliminated
+    return []
+
+def generate_round_matches(tournament, round_number, player_ids):
+    """Journée en cercle : chaque joueur affronte ses deux voisins, soit deux matchs chacun
+    
+    À deux joueurs, la journée se réduit à un seul match : la finale.
+    """
+    count = len(player_ids)
+    pairs = [(0, 1)] if count == 2 else [(i, (i + 1) % count) for i in range(count)]
+    rows = [{
+        'season_id': tournament.season_id,
+        'week_number': round_number,
+        'match_number': number,
+        'tournament_id': tournament.id,
+        'round_number': round_number,
+        'player1_id': player_ids[home],
+        'player2_id': player_ids[away]
+    } for number, (home, away) in enumerate(pairs, 1)]
+    db.session.execute(db.insert(Match), rows)
+    return len(rows)
+
+def start_tournament(season, name, player_ids):
+    """Inscrit les joueurs et génère la première journée ; rien n'est commité ici"""
+    tournament = Tournament(name=name, season_id=season.id, current_round=1)
+    db.session.add(tournament)
+    db.session.flush()
+    db.session.execute(db.insert(TournamentPlayer), [
+        {'tournament_id': tournament.id, 'player_id': player_id} for player_id in player_ids
+    ])
+    generate_round_matches(tournament, 1, player_ids)
+    return tournament
+
+def advance_tournament(tournament, round_number):
+    """Clôt la journée si tous ses matchs sont joués : éliminations puis journée suivante
+    
+    Tout se fait dans la transaction en cours (rien n'est commité ici). Retourne
+    le message à afficher, ou None si la journée n'est pas terminée.
+    """
+    if tournament.status != 'in_progress' or round_number != tournament.current_round:
+        return None
+    
+    pending = db.session.scalar(db.select(func.count(Match.id)).where(
+        Match.tournament_id == tournament.id,
+        Match.round_number == round_number,
+        Match.is_completed.is_not(True)
+    ))
+    if pending:
+        return None
+    
+    # Bilan de la journée pour tous les joueurs encore en lice, en une requête agrégée
+    contenders = [s for s in _tournament_entries(tournament.id, Match.round_number == round_number)
+                  if not s['is_eliminated']]
+    contenders.sort(key=_round_key, reverse=True)
+    
+    if len(contenders) == 2:
+        champion, runner_up = contenders
+        if champion['wins']:
+            runner_up['entry'].is_eliminated = True
+            runner_up['entry'].elimination_round = round_number
+            tournament.status = 'finished'
+            tournament.champion_id = champion['player'].id
+            return '🏆 Tournoi terminé ! Nous avons un champion !'
+        eliminated = []  # Finale nulle : elle est rejouée
+    else:
+        eliminated = select_eliminated(contenders)
+        for stats in eliminated:
+            stats['entry'].is_eliminated = True
+            stats['entry'].elimination_round = round_number
+    
+    # Les joueurs restants sont rangés selon leur journée : les voisins sont de niveau proche
+    eliminated_ids = {s['player'].id for s in eliminated}
+    remaining = [s['player'].id for s in contenders if s['player'].id not in eliminated_ids]
+    tournament.current_round += 1
+    generate_round_matches(tournament, tournament.current_round, remaining)
+    
+    if len(remaining) == 2:
+        if len(contenders) == 2:
+            return '🤝 Finale nulle : elle sera rejouée !'
+        return '🔥 Finale générée ! Le match décisif !'
+    if not eliminated:
+        return f'🤝 Égalité parfaite : journée {tournament.current_round} rejouée à {len(remaining)} joueurs.'
+    return f'✅ Journée {tournament.current_round} générée ! {len(remaining)} joueurs restants.'
+
+def advance_tournaments(matches):
+    """Fait avancer les tournois des matchs donnés, retourne les messages à afficher"""
+    rounds = set()
+    brackets = defaultdict(list)
+    for match in matches:
+        if match.bracket_slot is not None:
+            brackets[match.tournament].append(match)
+        elif match.tournament_id is not None:
+            rounds.add((match.tournament, match.round_number))
+    
+    messages = [advance_tournament(tournament, round_number) for tournament, round_number in rounds]
+    for tournament, bracket_matches in brackets.items():
+        messages.extend(advance_knockout(tournament, bracket_matches))
+    return [message for message in messages if message]
+
+def get_current_tournament(format='elimination'):
+    return Tournament.query.filter_by(format=format).order_by(Tournament.id.desc()).first()
+
+KNOCKOUT_STAGES = {1: 'Finale', 2: 'Demi-finales', 4: 'Quarts de finale', 8: 'Huitièmes de finale',
+                   16: 'Seizièmes de finale'}
+
+def stage_level(slot):
+    """Premier emplacement du tour d'un emplacement du tableau : 1, 2, 4, 8..."""
+    return 1 << (slot.bit_length() - 1)
+
+def knockout_stage_name(level):
+    return KNOCKOUT_STAGES.get(level, f'Tour à {2 * level} joueurs')
+
+def seed_order(size):
+    """Têtes de série dans l'ordre du tableau : 1 et 2 ne peuvent se croiser qu'en finale"""
+    order = [1]
+    while len(order) < size:
+        order = [seed for top in order for seed in (top, 2 * len(order) + 1 - top)]
+    return order
+
+def _bracket_row(tournament, slot, round_number, player1_id, player2_id):
+    return {
+        'season_id': tournament.season_id,
+        'week_number': round_number,
+        'match_number': slot - stage_level(slot) + 1,
+        'tournament_id': tournament.id,
+        'round_number': round_number,
+        'bracket_slot': slot,
+        'player1_id': player1_id,
+        'player2_id': player2_id
+    }
+
+def start_knockout(season, name, player_ids):
+    """Tableau à élimination directe, player_ids rangés par tête de série ; rien n'est commité ici
+    
+    Le nombre de joueurs doit être une puissance de deux. Le premier tour occupe
+    les emplacements size/2 à size-1 du tableau.
+    """
+    size = len(player_ids)
+    first_slot = size // 2
+    tournament = Tournament(name=name, season_id=season.id, format='knockout', current_round=1)
+    db.session.add(tournament)
+    db.session.flush()
+    db.session.execute(db.insert(TournamentPlayer), [
+        {'tournament_id': tournament.id, 'player_id': player_id} for player_id in player_ids
+    ])
+    
+    order = seed_order(size)
+    db.session.execute(db.insert(Match), [
+        _bracket_row(tournament, first_slot + k, 1,
+                     player_ids[order[2 * k] - 1], player_ids[order[2 * k + 1] - 1])
+        for k in range(first_slot)
+    ])
+    return tournament
+
+def advance_knockout(tournament, matches):
+    """Qualifie les vainqueurs pour l'emplacement parent (slot // 2) ; rien n'est commité ici
+    
+    Un emplacement ne dépend que de ses deux enfants 2p et 2p+1 : une requête
+    indexée par match à créer, quelle que soit la taille du tableau.
+    """
+    messages = []
+    losers = defaultdict(list)
+    for match in matches:
+        losers[match.round_number].append(
+            match.player2_id if match.winner_id == match.player1_id else match.player1_id)
+        if match.bracket_slot == 1:
+            tournament.status = 'finished'
+            tournament.champion_id = match.winner_id
+            messages.append('🏆 Tournoi terminé ! Nous avons un champion !')
+    
+    for round_number, player_ids in losers.items():
+        db.session.execute(
+            db.update(TournamentPlayer)
+            .where(TournamentPlayer.tournament_id == tournament.id,
+                   TournamentPlayer.player_id.in_(player_ids))
+            .values(is_eliminated=True, elimination_round=round_number)
+        )
+    
+    created = defaultdict(int)
+    for parent in sorted({match.bracket_slot // 2 for match in matches if match.bracket_slot > 1}):
+        children = db.session.scalars(
+            db.select(Match)
+            .where(Match.tournament_id == tournament.id, Match.bracket_slot.in_((2 * parent, 2 * parent + 1)))
+            .order_by(Match.bracket_slot)
+        ).all()
+        if len(children) < 2 or not all(child.winner_id for child in children):
+            continue
+        
+        home, away = children
+        round_number = home.round_number + 1
+        db.session.add(Match(**_bracket_row(tournament, parent, round_number, home.winner_id, away.winner_id)))
+        tournament.current_round = max(tournament.current_round, round_number)
+        created[stage_level(parent)] += 1
+    
+    for level, count in sorted(created.items(), reverse=True):
+        if level == 1:
+            messages.append('🔥 Finale générée ! Le match décisif !')
+        else:
+            messages.append(f'✅ {knockout_stage_name(level)} : {count} match(s) généré(s)')
+    return messages
+
+def load_bracket(tournament):
+    """Tableau complet en une requête, indexé par emplacement (None tant qu'un match n'existe pas)"""
+    matches = Match.query.options(
+        joinedload(Match.player1), joinedload(Match.player2), joinedload(Match.winner)
+    ).filter_by(tournament_id=tournament.id).all()
+    
+    size = 1 << max(match.bracket_slot for match in matches).bit_length() if matches else 0
+    bracket = [None] * size
+    for match in matches:
+        bracket[match.bracket_slot] = match
+    return bracket
+
+def bracket_stage(bracket, level):
+    """Matchs existants d'un tour, level étant son premier emplacement"""
+    return [match for match in bracket[level:2 * level] if match is not None]
+
+def parse_since(value):
+    """Date ISO 8601 du paramètre since, None si absent"""
+    if not value:
+        return None
+    return datetime.fromisoformat(value)
+
+def _stream(statement):
+    """Parcourt une requête par lots de EXPORT_CHUNK_SIZE lignes sans tout charger en mémoire"""
+    result = db.session.execute(statement.execution_options(yield_per=app.config['EXPORT_CHUNK_SIZE']))
+    for row in result:
+        yield row._asdict()
+
+def _touched_seasons(since):
+    """Saisons dont au moins un match a été créé ou modifié depuis since"""
+    return db.select(Match.season_id).where(Match.updated_date >= since).distinct()
+
+SEASON_EXPORT_FIELDS = ('id', 'name', 'start_date', 'current_week', 'is_active', 'status')
+
+def export_seasons(since=None):
+    statement = db.select(*(getattr(Season, field) for field in SEASON_EXPORT_FIELDS)).order_by(Season.id)
+    if since is not None:
+        statement = statement.where((Season.start_date >= since) | Season.id.in_(_touched_seasons(since)))
+    return SEASON_EXPORT_FIELDS, _stream(statement)
+
+def export_matches(since=None):
+    """Matchs de championnat et de tournoi, noms des joueurs et de la division inclus"""
+    player1 = db.aliased(Player)
+    player2 = db.aliased(Player)
+    winner = db.aliased(Player)
+    columns = (
+        Match.id, Match.season_id, Match.tournament_id, Division.name.label('division'),
+        Match.week_number, Match.match_number, Match.round_number, Match.bracket_slot,
+        Match.date, Match.updated_date,
+        player1.name.label('player1'), player2.name.label('player2'),
+        Match.player1_score, Match.player2_score, Match.is_completed, winner.name.label('winner'),
+    )
+    statement = (
+        db.select(*columns)
+        .join(player1, player1.id == Match.player1_id)
+        .join(player2, player2.id == Match.player2_id)
+        .outerjoin(winner, winner.id == Match.winner_id)
+        .outerjoin(Division, Division.id == Match.division_id)
+        .order_by(Match.id)
+    )
+    if since is not None:
+        statement = statement.where(Match.updated_date >= since)
+    return tuple(column.key for column in columns), _stream(statement)
+
+STANDINGS_EXPORT_FIELDS = ('season_id', 'week_number', 'division', 'player') + STANDINGS_FIELDS
+
+def _standings_statement(model, week_column, since):
+    statement = (
+        db.select(model.season_id, week_column.label('week_number'), Division.name.label('division'),
+                  Player.name.label('player'), *(getattr(model, field) for field in STANDINGS_FIELDS))
+        .join(Player, Player.id == model.player_id)
+        .outerjoin(Division, Division.id == Player.division_id)
+        .order_by(model.season_id, week_column, model.points.desc(), Player.name)
+    )
+    if since is not None:
+        statement = statement.where(model.season_id.in_(_touched_seasons(since)))
+    return statement
+
+def export_standings(since=None):
+    """Classements matérialisés : cumulés (week_number vide) puis hebdomadaires
+    
+    Avec since, les classements complets des saisons touchées depuis cette date
+    sont renvoyés, un classement n'ayant pas de sens ligne à ligne.
+    """
+    def rows():
+        yield from _stream(_standings_statement(SeasonStandings, db.null(), since))
+        yield from _stream(_standings_statement(WeeklyStandings, WeeklyStandings.week_number, since))
+    return STANDINGS_EXPORT_FIELDS, rows()
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def write_csv(fields, rows):
+    """Sérialise les lignes en CSV par blocs, l'en-tête partant immédiatement"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    for count, row in enumerate(rows, 1):
+        writer.writerow([_export_value(row[field]) for field in fields])
+        if count % app.config['EXPORT_CHUNK_SIZE'] == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def write_jsonl(fields, rows):
+    """Sérialise les lignes en JSON Lines, un objet par ligne"""
+    chunk = []
+    for row in rows:
+        chunk.append(json.dumps({field: _export_value(row[field]) for field in fields}, ensure_ascii=False))
+        if len(chunk) == app.config['EXPORT_CHUNK_SIZE']:
+            yield '\n'.join(chunk) + '\n'
+            chunk = []
+    if chunk:
+        yield '\n'.join(chunk) + '\n'
+
+EXPORT_DATASETS = {'seasons': export_seasons, 'matches': export_matches, 'standings': export_standings}
+EXPORT_FORMATS = {'csv': ('text/csv', write_csv), 'jsonl': ('application/x-ndjson', write_jsonl)}
+
+@app.cli.command('check-standings')
+@click.option('--season', 'season_id', type=int, help='Saison à vérifier (saison active par défaut)')
+@click.option('--repair', is_flag=True, help='Reconstruire les classements en cas d\'écart')
+def check_standings_command(season_id, repair):
+    """Vérifie les classements matérialisés contre un recalcul complet"""
+    if season_id is None:
+        season = get_active_season()
+        if not season:
+            click.echo('❌ Aucune saison active')
+            return
+        season_id = season.id
+    
+    differences = check_standings(season_id)
+    if not differences:
+        click.echo(f'✅ Classements de la saison {season_id} cohérents')
+        return
+    
+    for label, player_name, field, expected, stored in differences:
+        click.echo(f'⚠️ {label} / {player_name} / {field} : attendu {expected}, stocké {stored}')
+    
+    if repair:
+        with write_lock():
+            rebuild_standings(season_id)
+        standings_cache.invalidate()
+        click.echo(f'🔧 Classements de la saison {season_id} reconstruits')
+
+@app.cli.command('freeze-seasons')
+def freeze_seasons_command():
+    """Écrit le bilan figé des saisons terminées qui n'en ont pas encore"""
+    with write_lock():
+        seasons = db.session.scalars(
+            db.select(Season)
+            .outerjoin(SeasonSnapshot, SeasonSnapshot.season_id == Season.id)
+            .where(Season.is_active.is_(False), SeasonSnapshot.id.is_(None))
+            .order_by(Season.start_date)
+        ).all()
+        frozen = 0
+        for season in seasons:
+            try:
+                freeze_season(season)
+            except ValueError as error:
+                click.echo(f'❌ {error}')
+                continue
+            frozen += 1
+            click.echo(f'🧊 Bilan de {season.name} figé')
+        db.session.commit()
+    standings_cache.invalidate()
+    click.echo(f'✅ {frozen} saison(s) figée(s)')
+
+@app.cli.command('replay-ratings')
+def replay_ratings_command():
+    """Recalcule toutes les notes Elo (après un changement de ELO_K ou ELO_INITIAL)"""
+    with write_lock():
+        count = replay_ratings(db.session.connection())
+        db.session.commit()
+    standings_cache.invalidate()
+    click.echo(f'✅ Notes Elo recalculées sur {count} match(s)')
+
+@app.cli.command('build-assets')
+def build_assets_command():
+    """Construit les ressources statiques à empreinte et leurs versions gzip/brotli"""
+    manifest = assets.build_assets(ASSET_SOURCE_DIR, ASSET_OUTPUT_DIR)
+    for logical, size in assets.asset_sizes(manifest, ASSET_OUTPUT_DIR).items():
+        encoded = ', '.join(f'{encoding} {size[encoding] / 1024:.1f} KB'
+                            for encoding, _ in assets.ENCODINGS if size[encoding] is not None)
+        click.echo(f'📦 {logical} -> {manifest[logical]} : {size["raw"] / 1024:.1f} KB ({encoded})')
+    if assets.brotli is None:
+        click.echo('⚠️ Module brotli absent : versions gzip seulement')
+
+@app.cli.command('generate-season')
+@click.option('--weeks', type=int, required=True, help='Nombre de semaines à générer')
+def generate_season_command(weeks):
+    """Génère d'un coup le calendrier des prochaines semaines de la saison active"""
+    with write_lock():
+        season = get_active_season(fresh=True)
+        if not season:
+            click.echo('❌ Aucune saison active')
+            return
+        
+        existing = db.session.scalar(db.select(func.count(Match.id)).where(
+            Match.season_id == season.id, Match.tournament_id.is_(None),
+            Match.week_number >= season.current_week))
+        if existing:
+            click.echo('❌ Des matchs existent déjà à partir de la semaine actuelle')
+            return
+        
+        created = generate_season_fixtures(season.id, season.current_week, weeks)
+    standings_cache.invalidate()
+    click.echo(f'✅ {created} matchs générés (semaines {season.current_week} à {season.current_week + weeks - 1})')
+
+@app.cli.command('export')
+@click.argument('datasets', nargs=-1, type=click.Choice(sorted(EXPORT_DATASETS)))
+@click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+@click.option('--since', help='Seulement ce qui a changé depuis cette date ISO 8601')
+@click.option('--output-dir', default='exports', show_default=True, help='Dossier des fichiers exportés')
+def export_command(datasets, fmt, since, output_dir):
+    """Exporte en flux les saisons, les matchs et les classements (tous par défaut)"""
+    try:
+        since = parse_since(since)
+    except ValueError:
+        click.echo('❌ --since attendu au format ISO 8601 (ex. 2025-01-31T12:00:00)')
+        return
+    
+    os.makedirs(output_dir, exist_ok=True)
+    writer = EXPORT_FORMATS[fmt][1]
+    for dataset in datasets or EXPORT_DATASETS:
+        path = os.path.join(output_dir, f'{dataset}.{fmt}')
+        fields, rows = EXPORT_DATASETS[dataset](since)
+        with open(path, 'w', encoding='utf-8', newline='') as output:
+            for chunk in writer(fields, rows):
+                output.write(chunk)
+        click.echo(f'📤 {dataset} exporté dans {path}')
+
+def _add_column(table, column, ddl):
+    """Étape de migration qui ajoute une colonne seulement si elle n'existe pas encore"""
+    def step(connection):
+        columns = {info['name'] for info in inspect(connection).get_columns(table)}
+        if column not in columns:
+            connection.execute(db.text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl}'))
+    return step
+
+# Migrations versionnées : (version, description, instructions SQL ou étapes).
+# Les instructions sont figées et idempotentes pour s'appliquer aussi bien à une
+# base existante (SQLite ou PostgreSQL) qu'à une base tout juste créée par create_all().
+MIGRATIONS = [
+    (1, "Index composites et couvrants de la table match", [
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_match_season_week_number '
+        'ON "match" (season_id, week_number, match_number)',
+        'CREATE INDEX IF NOT EXISTS ix_match_player1_results '
+        'ON "match" (season_id, player1_id, is_completed, player1_score, player2_score)',
+        'CREATE INDEX IF NOT EXISTS ix_match_player2_results '
+        'ON "match" (season_id, player2_id, is_completed, player1_score, player2_score)',
+    ]),
+    (2, "Index uniques des classements matérialisés", [
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_weekly_standings_season_week_player '
+        'ON weekly_standings (season_id, week_number, player_id)',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_season_standings_season_player '
+        'ON season_standings (season_id, player_id)',
+    ]),
+    (3, "Divisions des joueurs et des matchs", [
+        _add_column('player', 'division_id', 'INTEGER REFERENCES division (id)'),
+        _add_column('match', 'division_id', 'INTEGER REFERENCES division (id)'),
+        "INSERT INTO division (name, level, created_date) "
+        "SELECT 'Division 1', 1, CURRENT_TIMESTAMP WHERE NOT EXISTS (SELECT 1 FROM division)",
+        'UPDATE player SET division_id = (SELECT MIN(id) FROM division) WHERE division_id IS NULL',
+        'UPDATE "match" SET division_id = (SELECT MIN(id) FROM division) WHERE division_id IS NULL',
+        'CREATE INDEX IF NOT EXISTS ix_player_division_active ON player (division_id, is_active)',
+        'CREATE INDEX IF NOT EXISTS ix_match_season_division_week '
+        'ON "match" (season_id, division_id, week_number)',
+    ]),
+    (4, "Matchs de tournoi", [
+        _add_column('match', 'tournament_id', 'INTEGER REFERENCES tournament (id)'),
+        _add_column('match', 'round_number', 'INTEGER'),
+        _add_column('match', 'winner_id', 'INTEGER REFERENCES player (id)'),
+        'UPDATE "match" SET winner_id = CASE '
+        'WHEN player1_score > player2_score THEN player1_id '
+        'WHEN player2_score > player1_score THEN player2_id END '
+        'WHERE is_completed AND winner_id IS NULL',
+        # L'unicité des numéros de match ne concerne plus que le championnat
+        'DROP INDEX IF EXISTS uq_match_season_week_number',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_match_league_number '
+        'ON "match" (season_id, week_number, match_number) WHERE tournament_id IS NULL',
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_match_tournament_round_number '
+        'ON "match" (tournament_id, round_number, match_number)',
+    ]),
+    (5, "Tableaux à élimination directe", [
+        _add_column('tournament', 'format', "VARCHAR(20) DEFAULT 'elimination'"),
+        _add_column('match', 'bracket_slot', 'INTEGER'),
+        "UPDATE tournament SET format = 'elimination' WHERE format IS NULL",
+        'CREATE UNIQUE INDEX IF NOT EXISTS uq_match_tournament_bracket_slot '
+        'ON "match" (tournament_id, bracket_slot)',
+    ]),
+    (6, "Date de modification des matchs pour les exports incrémentaux", [
+        _add_column('match', 'updated_date', 'TIMESTAMP'),
+        'UPDATE "match" SET updated_date = date WHERE updated_date IS NULL',
+        'CREATE INDEX IF NOT EXISTS ix_match_updated_date ON "match" (updated_date)',
+    ]),
+    (7, "Index de pagination de l'historique des saisons", [
+        'CREATE INDEX IF NOT EXISTS ix_season_start_date_id ON season (start_date, id)',
+    ]),
+    (8, "Classement Elo des joueurs et des matchs", [
+        _add_column('player', 'rating', 'FLOAT NOT NULL DEFAULT 1500'),
+        _add_column('match', 'rating_seq', 'INTEGER'),
+        _add_column('match', 'player1_elo', 'FLOAT'),
+        _add_column('match', 'player2_elo', 'FLOAT'),
+        _add_column('match', 'elo_delta', 'FLOAT'),
+        'CREATE INDEX IF NOT EXISTS ix_match_player1_rating ON "match" (player1_id, rating_seq)',
+        'CREATE INDEX IF NOT EXISTS ix_match_player2_rating ON "match" (player2_id, rating_seq)',
+        replay_ratings,
+    ]),
+    (9, "Classements matérialisés reconstruits depuis les matchs existants", [
+        rebuild_all_standings,
+    ]),
+]
+
+def get_schema_version():
+    """Retourne la dernière version de schéma appliquée (0 si aucune)"""
+    return db.session.scalar(db.select(func.max(SchemaVersion.version))) or 0
+
+def run_migrations():
+    """Applique les migrations en attente, chacune dans sa propre transaction"""
+    SchemaVersion.__table__.create(db.engine, checkfirst=True)
+    current_version = get_schema_version()
+    db.session.commit()
+    
+    applied = []
+    for version, description, statements in MIGRATIONS:
+        if version <= current_version:
+            continue
+        with db.engine.begin() as connection:
+            for statement in statements:
+                if callable(statement):
+                    statement(connection)
+                else:
+                    connection.execute(db.text(statement))
+            connection.execute(
+                db.insert(SchemaVersion).values(version=version, description=description,
+                                                applied_date=datetime.utcnow())
+            )
+        applied.append((version, description))
+    return applied
+
+def init_db():
+    """Crée les tables manquantes puis met le schéma à jour"""
+    db.create_all()
+    return run_migrations()
+
+@app.cli.command('db-upgrade')
+def db_upgrade_command():
+    """Crée les tables manquantes et applique les migrations en attente"""
+    applied = init_db()
+    for version, description in applied:
+        click.echo(f'🔧 Migration {version} appliquée : {description}')
+    click.echo(f'✅ Schéma à jour (version {get_schema_version()})')
+
+def start_backup_scheduler():
+    """Démarre les instantanés incrémentaux en arrière-plan si BACKUP_INTERVAL est défini (SQLite seulement)
+    
+    Chaque worker appelle cette fonction, mais un seul processus à la fois prend les
+    instantanés (voir backup_db.start_scheduler).
+    """
+    if app.config['BACKUP_INTERVAL'] <= 0:
+        return None
+    with app.app_context():
+        if db.engine.url.get_backend_name() != 'sqlite':
+            return None
+        db_path = db.engine.url.database
+    return backup_db.start_scheduler(app.config['BACKUP_INTERVAL'], db_path, app.config['BACKUP_STORE_PATH'])
+
+backup_scheduler = start_backup_scheduler()
+
 if __name__ == '__main__':
     with app.app_context():
-        # Crée la base de données seulement si elle n'existe pas
-        db.create_all()
+        # Crée les tables manquantes et applique les migrations en attente
+        init_db()
         print("⚽ FC 26 League démarrée !")
         print("📊 Base de données prête - vos données sont persistantes !")
         
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Chaîne des ressources statiques pour FC 26 League
+Copie les feuilles de style et scripts de assets/ sous un nom à empreinte de contenu,
+avec leurs versions précompressées gzip et brotli, et tient le manifeste à jour
+"""
+
+import gzip
+import hashlib
+import json
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli absent : seules les versions gzip sont produites
+    brotli = None
+
+SOURCE_DIR = "assets"
+OUTPUT_DIR = os.path.join("static", "dist")
+MANIFEST_NAME = "manifest.json"
+
+# Versions précompressées : (encodage HTTP, suffixe du fichier)
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+def fingerprint(name, content):
+    """css/site.css -> css/site.<empreinte>.css : le nom change dès que le contenu change"""
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{extension}"
+
+def compress(content, encoding):
+    if encoding == "gzip":
+        # mtime fixe : le même contenu donne toujours le même fichier
+        return gzip.compress(content, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(content, quality=11)
+    return None
+
+def _write_atomic(path, data):
+    """Écrit via un fichier temporaire : plusieurs workers peuvent construire en même temps"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, path)
+
+def build_assets(source_dir=SOURCE_DIR, output_dir=OUTPUT_DIR):
+    """Construit les ressources manquantes et retourne le manifeste {nom logique: nom à empreinte}
+
+    Idempotent : une ressource déjà construite n'est ni réécrite ni recompressée. Les
+    anciennes versions sont conservées, pour les pages encore ouvertes après un déploiement.
+    """
+    manifest = {}
+    for root, _, names in os.walk(source_dir):
+        for name in sorted(names):
+            path = os.path.join(root, name)
+            logical = os.path.relpath(path, source_dir).replace(os.sep, "/")
+            with open(path, "rb") as f:
+                content = f.read()
+            built = fingerprint(logical, content)
+            manifest[logical] = built
+
+            target = os.path.join(output_dir, built)
+            if os.path.exists(target):
+                continue
+            # Versions compressées d'abord : le fichier brut signale une ressource complète
+            for encoding, suffix in ENCODINGS:
+                compressed = compress(content, encoding)
+                if compressed is not None and len(compressed) < len(content):
+                    _write_atomic(target + suffix, compressed)
+            _write_atomic(target, content)
+
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode()
+    try:
+        with open(manifest_path, "rb") as f:
+            unchanged = f.read() == data
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        _write_atomic(manifest_path, data)
+    return manifest
+
+def asset_sizes(manifest, output_dir=OUTPUT_DIR):
+    """Taille de chaque ressource construite : brute puis par encodage (None si absent)"""
+    sizes = {}
+    for logical, built in sorted(manifest.items()):
+        target = os.path.join(output_dir, built)
+        sizes[logical] = {"raw": os.path.getsize(target)}
+        for encoding, suffix in ENCODINGS:
+            sizes[logical][encoding] = os.path.getsize(target + suffix) if os.path.exists(target + suffix) else None
+    return sizes
+
+if __name__ == "__main__":
+    print("⚽ FC 26 League - Ressources statiques")
+    print("=" * 50)
+    for logical, size in asset_sizes(build_assets()).items():
+        encoded = ", ".join(f"{encoding} {size[encoding] / 1024:.1f} KB"
+                            for encoding, _ in ENCODINGS if size[encoding] is not None)
+        print(f"📦 {logical} : {size['raw'] / 1024:.1f} KB{f' ({encoded})' if encoded else ''}")
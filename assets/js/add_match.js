@@ -0,0 +1,127 @@
+let selectedPlayers = { 1: null, 2: null };
+
+function updatePlayerCard(playerNum, selectElement) {
+    const card = document.getElementById(`player${playerNum}Card`);
+    const selectedText = selectElement.options[selectElement.selectedIndex].text;
+
+    if (selectElement.value) {
+        card.classList.add('selected');
+        selectedPlayers[playerNum] = selectedText;
+
+        // Changer l'avatar en fonction du joueur sélectionné
+        const avatar = card.querySelector('.player-avatar');
+        avatar.innerHTML = selectedText.charAt(0).toUpperCase();
+    } else {
+        card.classList.remove('selected');
+        selectedPlayers[playerNum] = null;
+        const avatar = card.querySelector('.player-avatar');
+        avatar.innerHTML = '<i class="fas fa-user"></i>';
+    }
+
+    updatePreview();
+    validatePlayerSelection();
+}
+
+function validatePlayerSelection() {
+    const player1Select = document.querySelector('select[name="player1"]');
+    const player2Select = document.querySelector('select[name="player2"]');
+
+    // Empêcher de sélectionner le même joueur
+    if (player1Select.value && player2Select.value && player1Select.value === player2Select.value) {
+        alert('Un joueur ne peut pas jouer contre lui-même !');
+        player2Select.value = '';
+        updatePlayerCard(2, player2Select);
+    }
+}
+
+function setScore(score1, score2) {
+    document.querySelector('input[name="score1"]').value = score1;
+    document.querySelector('input[name="score2"]').value = score2;
+    updatePreview();
+}
+
+function updatePreview() {
+    const score1 = document.querySelector('input[name="score1"]').value;
+    const score2 = document.querySelector('input[name="score2"]').value;
+    const preview = document.getElementById('matchPreview');
+    const previewContent = document.getElementById('previewContent');
+
+    if (selectedPlayers[1] && selectedPlayers[2] && score1 !== '' && score2 !== '') {
+        preview.style.display = 'block';
+
+        let result = '';
+        if (parseInt(score1) > parseInt(score2)) {
+            result = `<span style="color: var(--primary-green);">Victoire de ${selectedPlayers[1]}</span>`;
+        } else if (parseInt(score2) > parseInt(score1)) {
+            result = `<span style="color: var(--primary-green);">Victoire de ${selectedPlayers[2]}</span>`;
+        } else {
+            result = '<span style="color: var(--gold);">Match nul</span>';
+        }
+
+        previewContent.innerHTML = `
+            <div style="margin-bottom: 0.5rem;">
+                <strong>${selectedPlayers[1]}</strong> vs <strong>${selectedPlayers[2]}</strong>
+            </div>
+            <div class="preview-score">${score1} - ${score2}</div>
+            <div style="margin-top: 0.5rem;">${result}</div>
+        `;
+    } else {
+        preview.style.display = 'none';
+    }
+}
+
+// Validation du formulaire
+document.getElementById('matchForm').addEventListener('submit', function(e) {
+    const player1 = document.querySelector('select[name="player1"]').value;
+    const player2 = document.querySelector('select[name="player2"]').value;
+    const score1 = document.querySelector('input[name="score1"]').value;
+    const score2 = document.querySelector('input[name="score2"]').value;
+
+    if (!player1 || !player2) {
+        e.preventDefault();
+        alert('Veuillez sélectionner les deux joueurs.');
+        return;
+    }
+
+    if (player1 === player2) {
+        e.preventDefault();
+        alert('Un joueur ne peut pas jouer contre lui-même !');
+        return;
+    }
+
+    if (score1 === '' || score2 === '') {
+        e.preventDefault();
+        alert('Veuillez saisir les scores des deux joueurs.');
+        return;
+    }
+
+    // Animation de soumission
+    const submitBtn = this.querySelector('button[type="submit"]');
+    submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Enregistrement...';
+    submitBtn.disabled = true;
+});
+
+// Animation des cartes au chargement
+document.addEventListener('DOMContentLoaded', function() {
+    const cards = document.querySelectorAll('.player-card');
+    cards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(30px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.6s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+});
+
+// Effet sonore simulé pour les interactions
+document.querySelectorAll('.quick-score-btn').forEach(btn => {
+    btn.addEventListener('click', function() {
+        this.style.transform = 'scale(0.95)';
+        setTimeout(() => {
+            this.style.transform = 'scale(1)';
+        }, 150);
+    });
+});
@@ -0,0 +1,75 @@
+let deleteUrl = '';
+
+function confirmDelete(username, url) {
+    document.getElementById('overlay').classList.add('show');
+    document.getElementById('confirmDialog').classList.add('show');
+    document.getElementById('playerName').textContent = username;
+    deleteUrl = url;
+}
+
+function proceedDelete() {
+    if (deleteUrl) {
+        // Animation de sortie
+        document.getElementById('confirmDialog').style.transform = 'translate(-50%, -50%) scale(0.8)';
+        setTimeout(() => {
+            window.location.href = deleteUrl;
+        }, 200);
+    }
+}
+
+function cancelDelete() {
+    document.getElementById('overlay').classList.remove('show');
+    document.getElementById('confirmDialog').classList.remove('show');
+    deleteUrl = '';
+}
+
+// Fermer la modal en cliquant sur l'overlay
+document.getElementById('overlay').addEventListener('click', cancelDelete);
+
+// Animation des cartes au chargement
+document.addEventListener('DOMContentLoaded', function() {
+    const cards = document.querySelectorAll('.participant-card');
+    cards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(20px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.5s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 100);
+    });
+
+    // Animation des statistiques
+    const statNumbers = document.querySelectorAll('.stat-number');
+    statNumbers.forEach(stat => {
+        const finalValue = parseInt(stat.textContent);
+        let currentValue = 0;
+        const increment = Math.ceil(finalValue / 15);
+
+        const counter = setInterval(() => {
+            currentValue += increment;
+            if (currentValue >= finalValue) {
+                currentValue = finalValue;
+                clearInterval(counter);
+            }
+            stat.textContent = currentValue;
+        }, 80);
+    });
+});
+
+// Validation du formulaire
+document.querySelector('form').addEventListener('submit', function(e) {
+    const input = this.querySelector('input[name="username"]');
+    const value = input.value.trim();
+
+    if (value.length < 2) {
+        e.preventDefault();
+        input.style.borderColor = '#ff4444';
+        input.focus();
+
+        setTimeout(() => {
+            input.style.borderColor = 'rgba(0, 255, 65, 0.3)';
+        }, 2000);
+    }
+});
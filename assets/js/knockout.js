@@ -0,0 +1,115 @@
+// Animation des cartes au chargement
+document.addEventListener('DOMContentLoaded', function() {
+    const matchCards = document.querySelectorAll('.match-card');
+
+    matchCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(30px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.6s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+
+    // Animation de la barre de progression
+    const progressBar = document.querySelector('.progress-fill');
+    if (progressBar) {
+        const targetWidth = progressBar.style.width;
+        progressBar.style.width = '0%';
+
+        setTimeout(() => {
+            progressBar.style.width = targetWidth;
+        }, 1000);
+    }
+});
+
+// Validation des scores
+document.querySelectorAll('form').forEach(form => {
+    form.addEventListener('submit', function(e) {
+        const scoreInputs = this.querySelectorAll('.score-input:not([disabled])');
+        let hasEmptyScores = false;
+
+        scoreInputs.forEach(input => {
+            if (input.value === '' || input.value === null) {
+                hasEmptyScores = true;
+                input.style.borderColor = '#ff4444';
+            } else {
+                input.style.borderColor = 'rgba(255, 255, 255, 0.3)';
+            }
+        });
+
+        if (hasEmptyScores) {
+            e.preventDefault();
+            alert('Veuillez saisir tous les scores avant de valider.');
+            return;
+        }
+
+        // Animation de soumission
+        const submitBtn = this.querySelector('button[type="submit"]');
+        if (submitBtn) {
+            submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Validation...';
+            submitBtn.disabled = true;
+        }
+    });
+});
+
+// Effets sonores simulés
+document.querySelectorAll('.score-input').forEach(input => {
+    input.addEventListener('focus', function() {
+        this.style.transform = 'scale(1.05)';
+    });
+
+    input.addEventListener('blur', function() {
+        this.style.transform = 'scale(1)';
+    });
+});
+
+// Animation spéciale pour le champion
+const championSection = document.querySelector('.champion-section');
+if (championSection) {
+    // Créer des confettis dynamiques
+    function createConfetti() {
+        const confetti = document.createElement('div');
+        confetti.innerHTML = ['🎉', '🏆', '⭐', '🎊'][Math.floor(Math.random() * 4)];
+        confetti.style.position = 'absolute';
+        confetti.style.fontSize = Math.random() * 20 + 10 + 'px';
+        confetti.style.left = Math.random() * 100 + '%';
+        confetti.style.top = '0';
+        confetti.style.pointerEvents = 'none';
+        confetti.style.animation = `confetti ${Math.random() * 2 + 2}s ease-out forwards`;
+
+        championSection.appendChild(confetti);
+
+        setTimeout(() => {
+            confetti.remove();
+        }, 4000);
+    }
+
+    // Lancer des confettis périodiquement
+    setInterval(createConfetti, 500);
+}
+
+// Mise à jour en temps réel des gagnants
+document.querySelectorAll('.score-input').forEach(input => {
+    input.addEventListener('input', function() {
+        const matchCard = this.closest('.match-card');
+        const playerRows = matchCard.querySelectorAll('.player-row');
+        const score1Input = matchCard.querySelector('input[name*="score1"]');
+        const score2Input = matchCard.querySelector('input[name*="score2"]');
+
+        if (score1Input && score2Input && score1Input.value && score2Input.value) {
+            const score1 = parseInt(score1Input.value);
+            const score2 = parseInt(score2Input.value);
+
+            playerRows.forEach(row => row.classList.remove('winner'));
+
+            if (score1 > score2) {
+                playerRows[0].classList.add('winner');
+            } else if (score2 > score1) {
+                playerRows[1].classList.add('winner');
+            }
+        }
+    });
+});
@@ -0,0 +1,117 @@
+// Mises à jour en direct : scores et classements poussés par le serveur (/events),
+// reportés dans la page sans la recharger
+(() => {
+    const script = document.currentScript;
+    if (!script || !window.EventSource) {
+        return;
+    }
+    const scope = script.dataset;
+
+    function sameScope(change, withWeek) {
+        return String(change.season) === scope.season
+            && String(change.division ?? '') === scope.division
+            && (!withWeek || String(change.week) === scope.week);
+    }
+
+    function label(color, text, bold) {
+        const span = document.createElement('span');
+        span.style.color = color;
+        if (bold) {
+            span.style.fontWeight = 'bold';
+        }
+        span.textContent = text;
+        return span;
+    }
+
+    function icon(name) {
+        const element = document.createElement('i');
+        element.className = `fas ${name}`;
+        return element;
+    }
+
+    // Ligne de match : score, gagnant et fin de la saisie
+    function patchMatch(match) {
+        const row = document.querySelector(`[data-live-match="${match.id}"]`);
+        if (!row) {
+            return;
+        }
+        row.style.background = 'rgba(0, 255, 136, 0.1)';
+
+        const score = row.querySelector('[data-live="score"]');
+        if (score) {
+            score.replaceChildren(label('var(--fc-neon-green)', `${match.score1} - ${match.score2}`, true));
+        }
+
+        const winner = row.querySelector('[data-live="winner"]');
+        if (winner) {
+            if (match.winner) {
+                const name = label('var(--fc-gold)', ` ${match.winner}`, true);
+                name.prepend(icon('fa-crown'));
+                winner.replaceChildren(name);
+            } else {
+                winner.replaceChildren(label(winner.dataset.drawColor || 'var(--fc-silver)', 'Match nul'));
+            }
+        }
+
+        const action = row.querySelector('[data-live="action"]');
+        if (action) {
+            const done = label('var(--fc-neon-green)', ' Terminé');
+            done.prepend(icon('fa-check-circle'));
+            action.replaceChildren(done);
+        }
+    }
+
+    function formatField(field, value, standing) {
+        if (field === 'goal_difference' && value > 0) {
+            return `+${value}`;
+        }
+        // Même rendu que les gabarits : 2.0 et non 2
+        if (field === 'goal_average' && standing.matches_played > 0 && Number.isInteger(value)) {
+            return value.toFixed(1);
+        }
+        return String(value);
+    }
+
+    // Classement : chaque ligne reçoit les valeurs de sa position, les médailles restent en place
+    function patchStandings(kind, standings) {
+        document.querySelectorAll(`[data-live-standings="${kind}"]`).forEach(table => {
+            const rows = table.querySelectorAll('[data-live-row]');
+            if (rows.length !== standings.length) {
+                // Nouveau joueur dans le classement : la page entière est à refaire
+                window.location.reload();
+                return;
+            }
+            rows.forEach((row, index) => {
+                const standing = standings[index];
+                row.querySelectorAll('[data-field]').forEach(cell => {
+                    const field = cell.dataset.field;
+                    cell.textContent = formatField(field, standing[field], standing);
+                    if (field === 'goal_difference') {
+                        cell.style.color = standing.goal_difference > 0 ? 'var(--fc-neon-green)'
+                            : standing.goal_difference < 0 ? 'var(--fc-plasma-pink)' : 'white';
+                    }
+                });
+            });
+        });
+    }
+
+    // Le navigateur se reconnecte seul et reprend après le dernier événement reçu (Last-Event-ID)
+    const source = new EventSource(`${scope.url}?since=${scope.since}`);
+
+    source.addEventListener('score', event => {
+        const change = JSON.parse(event.data);
+        change.matches.forEach(patchMatch);
+        if (sameScope(change, true)) {
+            patchStandings('weekly', change.weekly);
+        }
+        if (sameScope(change, false)) {
+            patchStandings('cumulative', change.cumulative);
+        }
+    });
+
+    // Trop de changements manqués pour les rejouer : rechargement complet
+    source.addEventListener('reload', () => {
+        source.close();
+        window.location.reload();
+    });
+})();
@@ -0,0 +1,9 @@
+function showSeasonDetails(seasonId, seasonName) {
+    const detailsElement = document.getElementById('season-details-' + seasonId);
+    if (detailsElement.style.display === 'none') {
+        detailsElement.style.display = 'block';
+        detailsElement.scrollIntoView({ behavior: 'smooth', block: 'nearest' });
+    } else {
+        detailsElement.style.display = 'none';
+    }
+}
@@ -0,0 +1,95 @@
+// Animation des cartes au chargement
+document.addEventListener('DOMContentLoaded', function() {
+    const matchCards = document.querySelectorAll('.match-card');
+
+    matchCards.forEach((card, index) => {
+        card.style.opacity = '0';
+        card.style.transform = 'translateY(30px)';
+
+        setTimeout(() => {
+            card.style.transition = 'all 0.6s ease';
+            card.style.opacity = '1';
+            card.style.transform = 'translateY(0)';
+        }, index * 200);
+    });
+});
+
+// Validation des formulaires
+document.querySelectorAll('form').forEach(form => {
+    form.addEventListener('submit', function(e) {
+        const score1 = this.querySelector('input[name="score1"]').value;
+        const score2 = this.querySelector('input[name="score2"]').value;
+
+        if (!score1 || !score2) {
+            e.preventDefault();
+            alert('Veuillez saisir les deux scores avant de valider.');
+            return;
+        }
+
+        // Animation de soumission
+        const submitBtn = this.querySelector('button[type="submit"]');
+        if (submitBtn) {
+            submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Enregistrement...';
+            submitBtn.disabled = true;
+        }
+    });
+});
+
+// Effets sonores simulés pour les inputs
+document.querySelectorAll('.score-input').forEach(input => {
+    input.addEventListener('focus', function() {
+        this.style.transform = 'scale(1.1)';
+    });
+
+    input.addEventListener('blur', function() {
+        this.style.transform = 'scale(1)';
+    });
+
+    input.addEventListener('input', function() {
+        // Animation lors de la saisie
+        this.style.borderColor = 'var(--gold)';
+        setTimeout(() => {
+            this.style.borderColor = 'var(--primary-green)';
+        }, 300);
+    });
+});
+
+// Confettis pour le champion
+const championSection = document.querySelector('.champion-announcement');
+if (championSection) {
+    function createConfetti() {
+        const confetti = document.createElement('div');
+        confetti.innerHTML = ['🎉', '🏆', '⭐', '🎊'][Math.floor(Math.random() * 4)];
+        confetti.style.position = 'absolute';
+        confetti.style.fontSize = Math.random() * 20 + 10 + 'px';
+        confetti.style.left = Math.random() * 100 + '%';
+        confetti.style.top = '0';
+        confetti.style.pointerEvents = 'none';
+        confetti.style.animation = `confetti ${Math.random() * 2 + 2}s ease-out forwards`;
+
+        championSection.appendChild(confetti);
+
+        setTimeout(() => {
+            confetti.remove();
+        }, 4000);
+    }
+
+    // Lancer des confettis périodiquement
+    setInterval(createConfetti, 800);
+
+    // Ajouter le CSS pour l'animation des confettis
+    const style = document.createElement('style');
+    style.textContent = `
+        @keyframes confetti {
+            0% {
+                transform: translateY(0) rotate(0deg);
+                opacity: 1;
+            }
+            100% {
+                transform: translateY(-200px) rotate(720deg);
+                opacity: 0;
+            }
+        }
+    `;
+    document.head.appendChild(style);
+}
@@ -0,0 +1,28 @@
+// Animation des cartes au chargement
+document.addEventListener('DOMContentLoaded', function() {
+    const rows = document.querySelectorAll('.player-row');
+
+    rows.forEach((row, index) => {
+        row.style.opacity = '0';
+        row.style.transform = 'translateX(-20px)';
+
+        setTimeout(() => {
+            row.style.transition = 'all 0.5s ease';
+            row.style.opacity = '1';
+            row.style.transform = 'translateX(0)';
+        }, index * 100);
+    });
+
+    // Animation des éléments du podium
+    const podiumPlaces = document.querySelectorAll('.podium-place');
+    podiumPlaces.forEach((place, index) => {
+        place.style.opacity = '0';
+        place.style.transform = 'translateY(50px)';
+
+        setTimeout(() => {
+            place.style.transition = 'all 0.8s ease';
+            place.style.opacity = '1';
+            place.style.transform = 'translateY(0)';
+        }, (index + 1) * 300);
+    });
+});
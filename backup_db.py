@@ -5,11 +5,101 @@ Crée des copies de sauvegarde de la base de données avec horodatage
 """
 
 import os
-import shutil
 import sqlite3
+import time
+import hashlib
+import threading
+import zlib
+from contextlib import contextmanager
 from datetime import datetime
 import json
 
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus pour le planificateur
+    fcntl = None
+
+DB_PATH = "instance/fifa25.db"
+BACKUP_DIR = "backups"
+STORE_DIR = os.path.join(BACKUP_DIR, "store")
+
+# Fichiers partagés avec l'application (mêmes variables d'environnement) : verrou des
+# écritures et versions du cache, changées après une restauration
+WRITE_LOCK_PATH = os.environ.get("DB_WRITE_LOCK_PATH", os.path.join("instance", "db-write.lock"))
+CACHE_VERSIONS_PATH = os.environ.get("STANDINGS_CACHE_PATH", os.path.join("instance", "cache.db"))
+
+# Sauvegardes incrémentales : taille des blocs (multiple de la taille de page SQLite)
+# et rétention par défaut (instantanés horaires, quotidiens, hebdomadaires conservés)
+CHUNK_SIZE = 64 * 1024
+RETENTION = {"hourly": 24, "daily": 7, "weekly": 4}
+
+# Format du WAL SQLite (en-tête du fichier, en-tête de chaque trame) et tentatives
+# d'instantané cohérent quand des écritures arrivent pendant le point de contrôle
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+SNAPSHOT_ATTEMPTS = 5
+
+# Copie en ligne : pages copiées par étape et pause entre deux étapes (secondes),
+# pour que l'application continue de lire et d'écrire pendant la sauvegarde
+PAGES_PER_STEP = 1024
+STEP_PAUSE = 0.01
+
+def online_copy(source_path, dest_path, pages_per_step=PAGES_PER_STEP, pause=STEP_PAUSE):
+    """Copie une base SQLite par l'API de sauvegarde en ligne, puis vérifie la copie
+    
+    La copie est écrite dans un fichier temporaire, contrôlée par integrity_check
+    puis renommée atomiquement : dest_path n'est jamais une copie partielle.
+    Retourne (pages, octets, secondes).
+    """
+    tmp_path = dest_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    started = time.perf_counter()
+    progress = {"pages": 0}
+    
+    def on_step(status, remaining, total):
+        progress["pages"] = total
+    
+    source = sqlite3.connect(source_path, timeout=30, isolation_level=None)
+    target = sqlite3.connect(tmp_path)
+    try:
+        if source.execute("PRAGMA journal_mode").fetchone()[0] == "wal":
+            # Une transaction de lecture fige un instantané : les écritures de l'application
+            # continuent dans le WAL sans faire recommencer la copie à chaque étape
+            source.execute("BEGIN")
+            source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        source.backup(target, pages=pages_per_step, progress=on_step, sleep=pause)
+        # Copie autonome : un seul fichier, sans -wal ni -shm à côté
+        target.execute("PRAGMA journal_mode=DELETE")
+        page_size = target.execute("PRAGMA page_size").fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+    
+    try:
+        verify_integrity(tmp_path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    
+    os.replace(tmp_path, dest_path)
+    return progress["pages"], progress["pages"] * page_size, time.perf_counter() - started
+
+def verify_integrity(db_path):
+    """Lève une erreur si PRAGMA integrity_check ne répond pas 'ok'"""
+    conn = sqlite3.connect(db_path)
+    try:
+        result = [row[0] for row in conn.execute("PRAGMA integrity_check")]
+    finally:
+        conn.close()
+    if result != ["ok"]:
+        raise sqlite3.DatabaseError("Contrôle d'intégrité échoué : " + "; ".join(result[:5]))
+
+def print_throughput(pages, size, seconds):
+    rate = size / (1024 * 1024) / seconds if seconds > 0 else 0
+    print(f"⚡ Débit : {rate:.1f} MB/s ({pages} pages en {seconds:.2f} s)")
+
 def create_backup():
     """Crée une sauvegarde complète de la base de données"""
     
@@ -33,15 +123,16 @@ def create_backup():
     backup_path = os.path.join(backup_dir, backup_filename)
     
     try:
-        # Copier la base de données
-        shutil.copy2(db_path, backup_path)
+        # Copie en ligne : l'application reste disponible pendant la sauvegarde
+        pages, size, seconds = online_copy(db_path, backup_path)
         
         # Obtenir la taille du fichier
         size_mb = os.path.getsize(backup_path) / (1024 * 1024)
         
-        print(f"✅ Sauvegarde créée avec succès !")
+        print(f"✅ Sauvegarde créée et vérifiée avec succès !")
         print(f"📁 Fichier : {backup_path}")
         print(f"📊 Taille : {size_mb:.2f} MB")
+        print_throughput(pages, size, seconds)
         print(f"🕐 Date : {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
         
         # Créer un rapport de sauvegarde
@@ -162,6 +253,39 @@ def list_backups():
         print(f"   🕐 Date: {date_created.strftime('%d/%m/%Y %H:%M:%S')}")
         print("-" * 40)
 
+def swap_into_place(restored_path, db_path, lock_path=WRITE_LOCK_PATH, cache_path=CACHE_VERSIONS_PATH):
+    """Recopie une base vérifiée dans la base en service, sans remplacer le fichier
+    
+    Un renommage laisserait aux workers lancés leurs descripteurs sur l'ancien fichier,
+    avec des -wal et -shm qui ne lui correspondent plus. L'API de sauvegarde écrit au
+    contraire les pages dans la base en service, en une seule transaction et sous le
+    verrou d'écriture de l'application : les workers voient la restauration entière à
+    leur transaction suivante, sans redémarrage.
+    """
+    with _file_lock(lock_path):
+        source = sqlite3.connect(restored_path)
+        target = sqlite3.connect(db_path, timeout=30)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+    os.remove(restored_path)
+    invalidate_app_cache(cache_path)
+
+def invalidate_app_cache(cache_path=CACHE_VERSIONS_PATH):
+    """Change les versions du cache de l'application : plus aucune page d'avant la restauration"""
+    if not os.path.exists(cache_path):
+        return
+    conn = sqlite3.connect(cache_path, timeout=30)
+    try:
+        with conn:
+            conn.execute("UPDATE cache_version SET version = max(version + 1, ?)", (int(time.time() * 1000),))
+    except sqlite3.OperationalError:
+        pass  # Cache jamais utilisé : rien à invalider
+    finally:
+        conn.close()
+
 def restore_backup(backup_filename):
     """Restaure une sauvegarde spécifique"""
     
@@ -176,15 +300,18 @@ def restore_backup(backup_filename):
         # Faire une sauvegarde de la base actuelle avant restauration
         if os.path.exists(db_path):
             current_backup = f"fifa25_before_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            shutil.copy2(db_path, os.path.join("backups", current_backup))
+            online_copy(db_path, os.path.join("backups", current_backup))
             print(f"💾 Base actuelle sauvegardée : {current_backup}")
         
-        # Restaurer la sauvegarde
-        shutil.copy2(backup_path, db_path)
+        # Copier et vérifier la sauvegarde à côté de la base avant d'y toucher
+        restored_path = db_path + ".restore"
+        pages, size, seconds = online_copy(backup_path, restored_path)
+        
+        swap_into_place(restored_path, db_path)
         
         print(f"✅ Restauration réussie !")
         print(f"📁 {backup_filename} → fifa25.db")
-        print("🔄 Redémarrez l'application pour voir les changements")
+        print_throughput(pages, size, seconds)
         
         return True
         
@@ -192,6 +319,350 @@ def restore_backup(backup_filename):
         print(f"❌ Erreur lors de la restauration : {str(e)}")
         return False
 
+# --- Sauvegardes incrémentales -------------------------------------------------
+#
+# Le magasin contient des blocs compressés adressés par leur empreinte
+# (objects/ab/abcd...) et un manifeste JSON par instantané (snapshots/<id>.json)
+# listant les blocs de la base dans l'ordre. Un bloc déjà connu n'est jamais
+# réécrit : chaque instantané n'ajoute que les blocs modifiés depuis les autres.
+
+def _object_path(store_dir, digest):
+    return os.path.join(store_dir, "objects", digest[:2], digest)
+
+def _snapshot_dir(store_dir):
+    return os.path.join(store_dir, "snapshots")
+
+@contextmanager
+def _file_lock(path, blocking=True):
+    """Verrou de fichier exclusif ; cède False si non bloquant et déjà pris"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as lock_file:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _store_lock(store_dir, name="store.lock", blocking=True):
+    """Verrou de fichier sur le magasin ; cède False si non bloquant et déjà pris"""
+    return _file_lock(os.path.join(store_dir, name), blocking)
+
+def _wal_touched_pages(db_path):
+    """Numéros des pages écrites dans le WAL courant, lus dans les seuls en-têtes de trames
+    
+    Une trame appartient au WAL courant tant que ses sels sont ceux de l'en-tête ;
+    les trames d'une génération précédente, restées en fin de fichier, sont ignorées.
+    """
+    pages = set()
+    try:
+        wal = open(db_path + "-wal", "rb")
+    except FileNotFoundError:
+        return pages
+    with wal:
+        header = wal.read(WAL_HEADER_SIZE)
+        if len(header) < WAL_HEADER_SIZE:
+            return pages
+        page_size = int.from_bytes(header[8:12], "big")
+        salts = header[16:24]
+        offset = WAL_HEADER_SIZE
+        while True:
+            wal.seek(offset)
+            frame = wal.read(WAL_FRAME_HEADER_SIZE)
+            if len(frame) < WAL_FRAME_HEADER_SIZE or frame[8:16] != salts:
+                return pages
+            pages.add(int.from_bytes(frame[:4], "big"))
+            offset += WAL_FRAME_HEADER_SIZE + page_size
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+@contextmanager
+def _stable_database(db_path):
+    """Transaction de lecture pendant laquelle le fichier de la base reflète exactement l'instantané
+    
+    En WAL, les pages récentes vivent dans le WAL : un point de contrôle passif
+    les reporte dans la base. S'il a tout reporté, le fichier est l'état lu par la
+    transaction, et il ne bougera plus tant qu'elle reste ouverte (aucun point de
+    contrôle ne dépasse la marque d'un lecteur actif). Sinon une écriture est
+    arrivée entre-temps : on recommence un peu plus tard.
+    
+    Cède (page_size, page_count, pages touchées, signature du fichier avant le
+    point de contrôle, signature après) ; pages touchées vaut None hors WAL.
+    """
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    checkpointer = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    try:
+        wal = conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == "wal"
+        for attempt in range(1, SNAPSHOT_ATTEMPTS + 1):
+            conn.execute("BEGIN")
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            if not wal:
+                # Hors WAL, le verrou partagé de la transaction suffit à figer le fichier
+                yield page_size, page_count, None, None, _file_signature(db_path)
+                conn.execute("COMMIT")
+                return
+            
+            touched = _wal_touched_pages(db_path)
+            before = _file_signature(db_path)
+            _, logged, checkpointed = checkpointer.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+            if checkpointed == logged:
+                yield page_size, page_count, touched, before, _file_signature(db_path)
+                conn.execute("COMMIT")
+                return
+            conn.execute("ROLLBACK")
+            time.sleep(0.05 * attempt)
+        raise RuntimeError("Base trop sollicitée : instantané cohérent impossible, réessayez plus tard")
+    finally:
+        checkpointer.close()
+        conn.close()
+
+def _changed_chunks(previous, db_path, page_size, chunk_size, size, touched, before):
+    """Indices des blocs à relire, ou None s'il faut relire toute la base
+    
+    Le fichier n'est modifié que par les points de contrôle, qui recopient les pages du
+    WAL : si personne d'autre que le planificateur n'a fait de point de contrôle depuis
+    l'instantané précédent (même signature de fichier), seules les pages encore
+    présentes dans le WAL ont pu changer.
+    """
+    if (previous is None or touched is None or previous.get("chunk_size") != chunk_size
+            or previous.get("page_size") != page_size
+            or previous.get("source") != os.path.abspath(db_path)
+            or previous.get("signature") != before):
+        return None
+    
+    changed = {(page - 1) * page_size // chunk_size for page in touched}
+    if size != previous["size"]:
+        # Base agrandie ou réduite : le dernier bloc change de longueur
+        changed.add(max(size - 1, 0) // chunk_size)
+    return changed
+
+def create_incremental_backup(db_path=DB_PATH, store_dir=STORE_DIR, chunk_size=CHUNK_SIZE):
+    """Ajoute un instantané au magasin en n'écrivant que les blocs nouveaux
+    
+    La base est lue bloc par bloc depuis le fichier, un seul bloc en mémoire à la
+    fois, et seuls les blocs contenant des pages modifiées depuis l'instantané
+    précédent sont relus et hachés ; les autres reprennent l'empreinte du manifeste
+    précédent. Retourne le manifeste de l'instantané, enrichi du nombre de blocs
+    relus, et du nombre de blocs et d'octets compressés réellement écrits.
+    """
+    with _store_lock(store_dir):
+        snapshots = load_snapshots(store_dir)
+        previous = snapshots[0] if snapshots else None
+        with _stable_database(db_path) as (page_size, page_count, touched, before, after):
+            size = page_size * page_count
+            changed = _changed_chunks(previous, db_path, page_size, chunk_size, size, touched, before)
+            with open(db_path, "rb") as database:
+                return _write_snapshot(database, size, changed, previous, store_dir, chunk_size,
+                                       page_size=page_size, source=os.path.abspath(db_path), signature=after)
+
+def _write_snapshot(database, size, changed, previous, store_dir, chunk_size, **details):
+    snapshot_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    
+    chunks = []
+    scanned = 0
+    written = 0
+    written_bytes = 0
+    for index, offset in enumerate(range(0, size, chunk_size)):
+        if changed is not None and index not in changed and index < len(previous["chunks"]):
+            chunks.append(previous["chunks"][index])
+            continue
+        
+        database.seek(offset)
+        chunk = database.read(min(chunk_size, size - offset))
+        scanned += 1
+        digest = hashlib.sha256(chunk).hexdigest()
+        chunks.append(digest)
+        path = _object_path(store_dir, digest)
+        if os.path.exists(path):
+            continue
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = zlib.compress(chunk, 6)
+        with open(path + ".tmp", "wb") as f:
+            f.write(compressed)
+        os.replace(path + ".tmp", path)
+        written += 1
+        written_bytes += len(compressed)
+    
+    manifest = dict({
+        "id": snapshot_id,
+        "date": datetime.now().isoformat(),
+        "size": size,
+        "chunk_size": chunk_size,
+        "chunks": chunks
+    }, **details)
+    os.makedirs(_snapshot_dir(store_dir), exist_ok=True)
+    manifest_path = os.path.join(_snapshot_dir(store_dir), f"{snapshot_id}.json")
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    
+    return dict(manifest, scanned_chunks=scanned, written_chunks=written, written_bytes=written_bytes)
+
+def load_snapshots(store_dir=STORE_DIR):
+    """Manifestes des instantanés, du plus récent au plus ancien"""
+    directory = _snapshot_dir(store_dir)
+    if not os.path.exists(directory):
+        return []
+    
+    snapshots = []
+    for filename in os.listdir(directory):
+        if filename.endswith(".json"):
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+    snapshots.sort(key=lambda snapshot: snapshot["id"], reverse=True)
+    return snapshots
+
+def restore_snapshot(snapshot_id, db_path=DB_PATH, store_dir=STORE_DIR):
+    """Restaure la base telle qu'elle était au moment d'un instantané"""
+    manifest_path = os.path.join(_snapshot_dir(store_dir), f"{snapshot_id}.json")
+    if not os.path.exists(manifest_path):
+        print(f"❌ Instantané non trouvé : {snapshot_id}")
+        return False
+    
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        
+        # Instantané de la base actuelle avant restauration (seuls ses blocs modifiés sont écrits)
+        if os.path.exists(db_path):
+            current = create_incremental_backup(db_path, store_dir)
+            print(f"💾 Base actuelle sauvegardée : instantané {current['id']}")
+        
+        # Reconstituer la base bloc par bloc à côté de la base actuelle, puis la vérifier
+        restored_path = db_path + ".restore"
+        with open(restored_path, "wb") as f:
+            for digest in manifest["chunks"]:
+                with open(_object_path(store_dir, digest), "rb") as chunk_file:
+                    chunk = zlib.decompress(chunk_file.read())
+                if hashlib.sha256(chunk).hexdigest() != digest:
+                    raise ValueError(f"Bloc corrompu : {digest}")
+                f.write(chunk)
+        try:
+            verify_integrity(restored_path)
+        except Exception:
+            os.remove(restored_path)
+            raise
+        
+        swap_into_place(restored_path, db_path)
+        
+        print(f"✅ Restauration réussie !")
+        print(f"📁 Instantané {snapshot_id} → fifa25.db")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Erreur lors de la restauration : {str(e)}")
+        return False
+
+def select_retained(snapshots, retention=RETENTION, now=None):
+    """Identifiants à conserver : le plus récent de chaque heure, jour et semaine retenus"""
+    buckets = {
+        "hourly": lambda date: date.strftime("%Y%m%d%H"),
+        "daily": lambda date: date.strftime("%Y%m%d"),
+        "weekly": lambda date: date.strftime("%G%V"),
+    }
+    
+    retained = set()
+    for name, bucket_of in buckets.items():
+        seen = []
+        for snapshot in snapshots:  # du plus récent au plus ancien
+            bucket = bucket_of(datetime.fromisoformat(snapshot["date"]))
+            if bucket in seen:
+                continue
+            if len(seen) >= retention.get(name, 0):
+                break
+            seen.append(bucket)
+            retained.add(snapshot["id"])
+    return retained
+
+def prune_store(store_dir=STORE_DIR, retention=RETENTION):
+    """Applique la rétention puis supprime les blocs que plus aucun instantané n'utilise"""
+    with _store_lock(store_dir):
+        return _prune(store_dir, retention)
+
+def _prune(store_dir, retention):
+    snapshots = load_snapshots(store_dir)
+    retained = select_retained(snapshots, retention)
+    
+    removed_snapshots = 0
+    for snapshot in snapshots:
+        if snapshot["id"] not in retained:
+            os.remove(os.path.join(_snapshot_dir(store_dir), f"{snapshot['id']}.json"))
+            removed_snapshots += 1
+    
+    referenced = {digest for snapshot in snapshots if snapshot["id"] in retained
+                  for digest in snapshot["chunks"]}
+    removed_objects = 0
+    objects_dir = os.path.join(store_dir, "objects")
+    if os.path.exists(objects_dir):
+        for prefix in os.listdir(objects_dir):
+            for digest in os.listdir(os.path.join(objects_dir, prefix)):
+                if digest not in referenced:
+                    os.remove(os.path.join(objects_dir, prefix, digest))
+                    removed_objects += 1
+    return removed_snapshots, removed_objects
+
+def list_snapshots(store_dir=STORE_DIR):
+    """Liste les instantanés du magasin incrémental"""
+    snapshots = load_snapshots(store_dir)
+    if not snapshots:
+        print("📁 Aucun instantané trouvé")
+        return
+    
+    print(f"📋 {len(snapshots)} instantané(s) :")
+    print("=" * 60)
+    for snapshot in snapshots:
+        date = datetime.fromisoformat(snapshot["date"])
+        print(f"📸 {snapshot['id']}")
+        print(f"   📊 Taille: {snapshot['size'] / (1024 * 1024):.2f} MB ({len(snapshot['chunks'])} blocs)")
+        print(f"   🕐 Date: {date.strftime('%d/%m/%Y %H:%M:%S')}")
+        print("-" * 40)
+
+def run_scheduled_backup(db_path=DB_PATH, store_dir=STORE_DIR, min_interval=0, retention=RETENTION):
+    """Instantané + rétention, sauf si un instantané plus récent que min_interval secondes existe"""
+    snapshots = load_snapshots(store_dir)
+    if snapshots:
+        age = (datetime.now() - datetime.fromisoformat(snapshots[0]["date"])).total_seconds()
+        if age < min_interval:
+            return None
+    manifest = create_incremental_backup(db_path, store_dir)
+    prune_store(store_dir, retention)
+    return manifest
+
+def start_scheduler(interval, db_path=DB_PATH, store_dir=STORE_DIR, retention=RETENTION):
+    """Lance les instantanés périodiques dans un thread d'arrière-plan du processus
+    
+    Un seul processus planifie : celui qui détient le verrou scheduler.lock, gardé
+    tant qu'il vit. Les autres workers ne font que retenter de le prendre à chaque
+    intervalle, pour reprendre la main si ce processus s'arrête.
+    Retourne l'événement qui arrête le planificateur.
+    """
+    stop = threading.Event()
+    
+    def loop():
+        while not stop.is_set():
+            with _store_lock(store_dir, "scheduler.lock", blocking=False) as acquired:
+                if acquired:
+                    while not stop.wait(interval):
+                        try:
+                            run_scheduled_backup(db_path, store_dir, interval / 2, retention)
+                        except Exception as e:
+                            print(f"⚠️ Sauvegarde planifiée échouée : {str(e)}")
+                    return
+            stop.wait(interval)
+    
+    threading.Thread(target=loop, name="backup-scheduler", daemon=True).start()
+    return stop
+
 if __name__ == "__main__":
     print("⚽ FC 26 League - Gestionnaire de Sauvegarde")
     print("=" * 50)
@@ -207,11 +678,29 @@ if __name__ == "__main__":
             list_backups()
         elif command == "restore" and len(sys.argv) > 2:
             restore_backup(sys.argv[2])
+        elif command == "snapshot":
+            started = time.perf_counter()
+            manifest = create_incremental_backup()
+            print(f"✅ Instantané {manifest['id']} : {manifest['scanned_chunks']}/{len(manifest['chunks'])} "
+                  f"bloc(s) relu(s), {manifest['written_chunks']} nouveau(x), "
+                  f"{manifest['written_bytes'] / 1024:.1f} KB écrits "
+                  f"en {time.perf_counter() - started:.2f} s")
+        elif command == "snapshots":
+            list_snapshots()
+        elif command == "restore-snapshot" and len(sys.argv) > 2:
+            restore_snapshot(sys.argv[2])
+        elif command == "prune":
+            removed_snapshots, removed_objects = prune_store()
+            print(f"🧹 {removed_snapshots} instantané(s) et {removed_objects} bloc(s) supprimés")
         else:
             print("Usage:")
-            print("  python backup_db.py backup          - Créer une sauvegarde")
-            print("  python backup_db.py list            - Lister les sauvegardes")
-            print("  python backup_db.py restore <file>  - Restaurer une sauvegarde")
+            print("  python backup_db.py backup                - Créer une sauvegarde")
+            print("  python backup_db.py list                  - Lister les sauvegardes")
+            print("  python backup_db.py restore <file>        - Restaurer une sauvegarde")
+            print("  python backup_db.py snapshot              - Créer un instantané incrémental")
+            print("  python backup_db.py snapshots             - Lister les instantanés")
+            print("  python backup_db.py restore-snapshot <id> - Restaurer un instantané")
+            print("  python backup_db.py prune                 - Appliquer la rétention")
     else:
         # Mode interactif
         print("Que voulez-vous faire ?")
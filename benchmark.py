@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Banc de performance pour FC 26 League
+Génère une ligue synthétique dans une base temporaire, chronomètre les chemins
+critiques et compte leurs requêtes SQL, puis compare le tout aux budgets enregistrés
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Marge tolérée sur le temps de référence (proportion) et en valeur absolue (secondes) :
+# en dessous de quelques millisecondes, le bruit de mesure l'emporte
+LATENCY_TOLERANCE = 0.5
+LATENCY_FLOOR = 0.005
+
+def build_league(players=10, weeks=8, seasons=3, divisions=1, seed=0):
+    """Crée une ligue synthétique : saisons passées complètes et saison en cours
+
+    La saison en cours a toutes ses semaines jouées sauf la dernière, générée mais
+    sans aucun score. Doit être appelé dans un contexte d'application, base vide.
+    """
+    from app import (db, Division, Player, Season, Match, init_db, generate_season_fixtures,
+                     record_match_scores, freeze_season, invalidate_active_season, standings_cache)
+
+    rng = random.Random(seed)
+    init_db()
+
+    # La migration des divisions crée déjà la première
+    division_rows = Division.query.order_by(Division.level).all()
+    division_rows += [Division(name=f"Division {level}", level=level)
+                      for level in range(len(division_rows) + 1, divisions + 1)]
+    db.session.add_all(division_rows)
+    db.session.add_all(Player(name=f"JOUEUR {number:03d}", is_active=True,
+                              division=division_rows[number % divisions])
+                       for number in range(1, players + 1))
+    db.session.commit()
+
+    start = datetime.utcnow() - timedelta(weeks=weeks * seasons)
+    for number in range(1, seasons + 1):
+        current = number == seasons
+        season = Season(name=f"Saison synthétique {number}", start_date=start + timedelta(weeks=weeks * (number - 1)),
+                        current_week=weeks if current else weeks + 1, is_active=current,
+                        status='in_progress' if current else 'finished')
+        db.session.add(season)
+        db.session.commit()
+
+        generate_season_fixtures(season.id, 1, weeks)
+        played = Match.query.filter(Match.season_id == season.id, Match.week_number < season.current_week)
+        record_match_scores([(match, rng.randint(0, 5), rng.randint(0, 5))
+                             for match in played.order_by(Match.week_number, Match.match_number)])
+        if not current:
+            freeze_season(season)
+        db.session.commit()
+
+    invalidate_active_season()
+    standings_cache.invalidate()
+    return season
+
+class QueryCounter:
+    """Compte les requêtes SQL émises par le thread de mesure pendant une mesure
+
+    Les threads d'arrière-plan de l'application (journal des changements) sont ignorés.
+    """
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        self.thread_id = threading.get_ident()
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        if threading.get_ident() == self.thread_id:
+            self.count += 1
+
+def run_benchmarks(repeat=5):
+    """Mesure chaque scénario `repeat` fois : temps médian et nombre maximal de requêtes"""
+    from app import (app, db, Match, get_active_season, standings_cache, calculate_cumulative_standings,
+                     simulate_season, odds_refresher)
+
+    client = app.test_client()
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+        season = get_active_season()
+        season_id, current_week = season.id, season.current_week
+        pending = [match_id for match_id, in db.session.execute(
+            db.select(Match.id).where(Match.season_id == season_id, Match.week_number == current_week,
+                                      Match.is_completed.is_(False)).order_by(Match.match_number))]
+
+    def get(path):
+        def call():
+            response = client.get(path)
+            assert response.status_code in (200, 302), f"{path} : HTTP {response.status_code}"
+        return call
+
+    def cold(call):
+        # Cache vidé avant chaque mesure, comme juste après un nouveau score
+        def prepare():
+            with app.app_context():
+                standings_cache.invalidate()
+        return prepare, call
+
+    def revalidated(path):
+        # Rafraîchissement d'une page déjà affichée : le navigateur renvoie son ETag
+        etags = {}
+        def prepare():
+            etags[path] = client.get(path).headers['ETag']
+        def call():
+            response = client.get(path, headers={'If-None-Match': etags[path]})
+            assert response.status_code == 304, f"{path} : HTTP {response.status_code} au lieu de 304"
+        return prepare, call
+
+    def score_next_match():
+        match_id = pending.pop(0)
+        response = client.post(f"/update_match/{match_id}", data={'score1': 2, 'score2': 1})
+        assert response.status_code == 302, f"update_match : HTTP {response.status_code}"
+
+    def open_next_week():
+        # Semaine vide suivante, préparée hors chronométrage
+        with app.app_context():
+            get_active_season().current_week += 1
+            db.session.commit()
+
+    def cumulative():
+        with app.app_context():
+            calculate_cumulative_standings(season_id)
+
+    def simulate():
+        # Tourne en arrière-plan dans l'application : mesuré ici pour suivre son coût
+        with app.app_context():
+            simulate_season(season_id)
+
+    scenarios = {
+        'home (froid)': cold(get('/')),
+        'home': (None, get('/')),
+        'home (304)': revalidated('/'),
+        'standings (froid)': cold(get('/standings')),
+        'standings': (None, get('/standings')),
+        'standings (304)': revalidated('/standings'),
+        'view_week (froid)': cold(get('/week/1')),
+        'view_week': (None, get('/week/1')),
+        'calculate_cumulative_standings': (None, cumulative),
+        'simulate_season': (None, simulate),
+        'update_match': (None, score_next_match),
+        'generate_week': (open_next_week, get('/generate_week')),
+    }
+    if len(pending) < repeat:
+        raise ValueError(f"{len(pending)} match(s) à jouer pour {repeat} répétitions : augmentez --players")
+
+    results = {}
+    for name, (prepare, call) in scenarios.items():
+        # Simulations d'arrière-plan lancées par les appels précédents : hors mesure
+        odds_refresher.wait()
+        # Premier appel hors mesure : imports, compilation des gabarits, connexions
+        if name not in ('update_match', 'generate_week'):
+            if prepare:
+                prepare()
+            call()
+        timings, queries = [], []
+        for _ in range(repeat):
+            odds_refresher.wait()
+            if prepare:
+                prepare()
+            counter.count = 0
+            started = time.perf_counter()
+            call()
+            timings.append(time.perf_counter() - started)
+            queries.append(counter.count)
+        results[name] = {'seconds': round(statistics.median(timings), 4), 'queries': max(queries)}
+    return results
+
+def check_budgets(results, baseline, tolerance=LATENCY_TOLERANCE):
+    """Liste des dépassements : plus de requêtes que la référence, ou temps au-delà de la marge"""
+    failures = []
+    for name, budget in baseline.items():
+        result = results.get(name)
+        if result is None:
+            failures.append(f"{name} : scénario absent")
+            continue
+        if result['queries'] > budget['queries']:
+            failures.append(f"{name} : {result['queries']} requêtes (budget {budget['queries']})")
+        limit = max(budget['seconds'] * (1 + tolerance), budget['seconds'] + LATENCY_FLOOR)
+        if result['seconds'] > limit:
+            failures.append(f"{name} : {result['seconds'] * 1000:.1f} ms (budget {limit * 1000:.1f} ms)")
+    return failures
+
+def print_results(results, baseline=None):
+    print(f"{'Scénario':<32} {'Temps':>10} {'Requêtes':>9}   Référence")
+    for name, result in results.items():
+        reference = ""
+        if baseline and name in baseline:
+            reference = f"{baseline[name]['seconds'] * 1000:.1f} ms / {baseline[name]['queries']}"
+        print(f"{name:<32} {result['seconds'] * 1000:>7.1f} ms {result['queries']:>9}   {reference}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Banc de performance de FC 26 League")
+    parser.add_argument("--players", type=int, default=10, help="joueurs de la ligue")
+    parser.add_argument("--weeks", type=int, default=8, help="semaines par saison")
+    parser.add_argument("--seasons", type=int, default=3, help="saisons, dont celle en cours")
+    parser.add_argument("--divisions", type=int, default=1, help="divisions")
+    parser.add_argument("--repeat", type=int, default=5, help="mesures par scénario")
+    parser.add_argument("--seed", type=int, default=0, help="graine des scores synthétiques")
+    parser.add_argument("--tolerance", type=float, default=LATENCY_TOLERANCE,
+                        help="marge sur le temps de référence (0.5 = +50 %%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="fichier des références")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="enregistrer les mesures comme nouvelles références")
+    args = parser.parse_args()
+
+    # Base, verrou d'écriture et cache dans un dossier jetable, avant d'importer l'application
+    workdir = tempfile.mkdtemp(prefix="fc26-bench-")
+    os.environ.update({
+        'FLASK_ENV': 'production',
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'DB_WRITE_LOCK_PATH': os.path.join(workdir, 'db-write.lock'),
+        'STANDINGS_CACHE_PATH': os.path.join(workdir, 'cache.db'),
+        'METRICS_PATH': os.path.join(workdir, 'metrics.db'),
+        'BACKUP_INTERVAL': '0',
+        'SLOW_REQUEST_MS': '0',
+        # Simulations d'arrière-plan lancées après la mesure qui les déclenche
+        'SIMULATION_DELAY': '0.2',
+    })
+    from app import app
+
+    params = {key: getattr(args, key) for key in ("players", "weeks", "seasons", "divisions", "seed")}
+    print("⚽ FC 26 League - Banc de performance")
+    print("=" * 50)
+    started = time.perf_counter()
+    with app.app_context():
+        build_league(**params)
+    print(f"🏗️ Ligue synthétique {params} créée en {time.perf_counter() - started:.1f} s\n")
+
+    results = run_benchmarks(args.repeat)
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baselines = json.load(f)
+    key = ",".join(f"{name}={value}" for name, value in params.items())
+
+    if args.update_baseline:
+        print_results(results)
+        baselines[key] = results
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n💾 Références enregistrées pour {key} dans {args.baseline}")
+        return 0
+
+    baseline = baselines.get(key)
+    print_results(results, baseline)
+    if baseline is None:
+        print(f"\n⚠️ Aucune référence pour {key} : relancez avec --update-baseline")
+        return 0
+
+    failures = check_budgets(results, baseline, args.tolerance)
+    if failures:
+        print("\n❌ Budgets dépassés :")
+        for failure in failures:
+            print(f"  - {failure}")
+        return 1
+    print("\n✅ Tous les scénarios restent dans leur budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
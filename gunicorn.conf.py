@@ -0,0 +1,16 @@
+"""
+Configuration gunicorn de FC 26 League (lue automatiquement depuis le dossier courant)
+Workers à threads (gthread) : un flux /events occupe un thread qui dort sur une
+condition, sans connexion à la base ; quelques workers de nombreux threads tiennent
+donc beaucoup de connexions inactives pour peu de mémoire, sans monkey-patching
+"""
+
+import os
+
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 64))
+
+# Les flux se ferment d'eux-mêmes (LIVE_STREAM_DURATION) : un redémarrage n'attend
+# pas leur fin, les navigateurs se reconnectent sur les nouveaux workers
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 10))